@@ -2,14 +2,23 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 
+from app.data.arrow_cache import describe_table, numeric_columns, open_table, sum_by, text_columns
+from app.data.tickets import count_tickets, count_tickets_by, count_tickets_by_month
+from app.services.instrumentation import set_page, stage
+from app.services.metrics_service import get_kpis, start_reconciler
+from app.services.rollup_service import DIMENSIONS, dimension_values, resolution_stats
+from app.services.session_tokens import restore_session
+
 # ----------------------------
 # PAGE CONFIG
 # ----------------------------
 st.set_page_config(page_title="Analytics Dashboard", layout="wide", initial_sidebar_state="expanded")
+set_page("Analytics")
 
 # ----------------------------
 # AUTHENTICATION
 # ----------------------------
+restore_session(st.session_state, st.query_params)
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.error("Access denied. Please log in first.")
     st.stop()
@@ -32,17 +41,27 @@ st.divider()
 # ----------------------------
 # TOP METRICS CARDS
 # ----------------------------
+# Counters are kept up to date by database triggers, so this is a tiny read
+start_reconciler()
+with stage("kpis"):
+    kpis = get_kpis()
+
 st.subheader("Key Metrics Overview")
+st.caption("Changes are since the start of today (UTC).")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Current Threats", 14, "+2")
+    value, change = kpis["Current Threats"]
+    st.metric("Current Threats", value, f"{change:+d}", delta_color="inverse")
 with col2:
-    st.metric("Incidents Closed", 32, "+5")
+    value, change = kpis["Incidents Closed"]
+    st.metric("Incidents Closed", value, f"{change:+d}")
 with col3:
-    st.metric("Pending Tickets", 6, "-1")
+    value, change = kpis["Pending Tickets"]
+    st.metric("Pending Tickets", value, f"{change:+d}", delta_color="inverse")
 with col4:
-    st.metric("Open Cyber Incidents", 8, "+1")
+    value, change = kpis["Open Cyber Incidents"]
+    st.metric("Open Cyber Incidents", value, f"{change:+d}", delta_color="inverse")
 
 st.divider()
 
@@ -79,7 +98,10 @@ if csv_files:
     for fp in csv_files:
         st.markdown(f"### {fp.name}")
         try:
-            df = pd.read_csv(fp)
+            # Memory-mapped Arrow copy of the CSV, shared by every session
+            with stage("open_table", bytes=fp.stat().st_size) as rec:
+                table = open_table(fp)
+                rec["rows"] = table.num_rows
         except Exception as e:
             st.error(f"Failed to read {fp.name}: {e}")
             continue
@@ -88,19 +110,19 @@ if csv_files:
         # EXPANDABLE TABLE
         # ----------------------------
         with st.expander("Show Table Preview (10 rows)"):
-            st.dataframe(df.head(10), use_container_width=True)
+            st.dataframe(table.slice(0, 10), use_container_width=True)
 
         # ----------------------------
         # SUMMARY STATISTICS
         # ----------------------------
         with st.expander("Summary Statistics"):
-            st.dataframe(df.describe(include="all").transpose().fillna(""))
+            st.dataframe(describe_table(table), use_container_width=True)
 
         # ----------------------------
         # INTERACTIVE CHARTS
         # ----------------------------
-        numeric_cols = df.select_dtypes(include="number").columns.tolist()
-        cat_cols = df.select_dtypes(include="object").columns.tolist()
+        numeric_cols = numeric_columns(table)
+        cat_cols = text_columns(table)
 
         if numeric_cols:
             st.write("#### Interactive Charts")
@@ -114,7 +136,8 @@ if csv_files:
             with chart_tab_line:
                 if x_col and y_col:
                     try:
-                        st.line_chart(df.set_index(x_col)[y_col])
+                        columns = list(dict.fromkeys([x_col, y_col]))
+                        st.line_chart(table.select(columns).to_pandas().set_index(x_col, drop=False)[y_col])
                     except Exception:
                         st.info("Cannot plot line chart with selected columns.")
 
@@ -122,8 +145,7 @@ if csv_files:
             with chart_tab_bar:
                 if x_col and y_col:
                     try:
-                        grouped = df.groupby(x_col)[y_col].sum()
-                        st.bar_chart(grouped)
+                        st.bar_chart(sum_by(table, x_col, y_col))
                     except Exception:
                         st.info("Cannot plot bar chart with selected columns.")
 
@@ -131,8 +153,7 @@ if csv_files:
             with chart_tab_area:
                 if x_col and y_col:
                     try:
-                        grouped = df.groupby(x_col)[y_col].sum()
-                        st.area_chart(grouped)
+                        st.area_chart(sum_by(table, x_col, y_col))
                     except Exception:
                         st.info("Cannot plot area chart with selected columns.")
 
@@ -143,12 +164,11 @@ else:
     st.info("No CSV files found in project root or DATA folder.")
 
 # ----------------------------
-# ADDITIONAL ANALYTICS: IT Tickets
+# ADDITIONAL ANALYTICS: IT Tickets (shared database)
 # ----------------------------
-tickets_file = data_dir / "it_tickets.csv"
-if tickets_file.exists():
+# Counts come straight from indexed queries, no ticket rows are loaded
+if count_tickets():
     try:
-        tickets = pd.read_csv(tickets_file, parse_dates=["created_date", "resolved_date"], infer_datetime_format=True)
         st.divider()
         st.subheader("IT Tickets Analytics")
 
@@ -156,20 +176,45 @@ if tickets_file.exists():
 
         with col1:
             st.write("### Tickets by Priority")
-            if "priority" in tickets.columns:
-                counts = tickets["priority"].fillna("N/A").value_counts()
-                st.bar_chart(counts)
+            with stage("tickets_by_priority"):
+                counts = pd.Series(count_tickets_by("priority"), dtype="int64")
+            counts.index = counts.index.fillna("N/A")
+            st.bar_chart(counts.sort_values(ascending=False))
 
         with col2:
             st.write("### Tickets Created per Month")
-            if "created_date" in tickets.columns:
-                tickets["created_date"] = pd.to_datetime(tickets["created_date"], errors="coerce")
-                monthly = tickets.dropna(subset=["created_date"])
-                monthly["month"] = monthly["created_date"].dt.to_period("M").astype(str)
-                month_counts = monthly.groupby("month").size()
-                st.line_chart(month_counts)
+            with stage("tickets_by_month"):
+                month_counts = pd.Series(count_tickets_by_month(), dtype="int64")
+            st.line_chart(month_counts)
+
+        # Resolution time drill-down, read from the precomputed rollup cube
+        st.write("### Resolution Time (hours)")
+        by = st.selectbox("Break down by", DIMENSIONS, format_func=lambda d: d.replace("_", " ").title())
+        filter_cols = st.columns(3)
+        filters = {}
+        for col, dimension in zip(filter_cols, ("priority", "category", "assigned_to")):
+            if dimension == by:
+                continue
+            choice = col.selectbox(
+                dimension.replace("_", " ").title(), ["All", *dimension_values(dimension)],
+                key=f"mttr_{dimension}"
+            )
+            filters[dimension] = None if choice == "All" else choice
+
+        with stage("resolution_stats") as rec:
+            stats = resolution_stats(by, **filters)
+            rec["rows"] = len(stats)
+
+        if stats.empty:
+            st.info("No resolved tickets match these filters.")
+        else:
+            if by == "week":
+                st.line_chart(stats[["p50", "p90"]])
+            else:
+                st.bar_chart(stats[["p50", "p90"]])
+            st.dataframe(stats.round(1), use_container_width=True)
 
     except Exception as e:
-        st.error(f"Error visualizing it_tickets.csv: {e}")
+        st.error(f"Error visualizing tickets: {e}")
 else:
-    st.info("No DATA/it_tickets.csv file found.")
\ No newline at end of file
+    st.info("No tickets in the database yet. Run main.py to import DATA/it_tickets.csv.")
@@ -1,16 +1,36 @@
+import json
 import streamlit as st
-import sqlite3
-import pandas as pd
-from pathlib import Path
+import time
+from datetime import date
+
+from app.data import audit
+from app.data.changes import get_table_versions
+from app.data.incidents import delete_incident, insert_incident, list_incidents
+from app.data.search import search
+from app.data.tickets import create_ticket, list_tickets
+from app.data.tickets import delete_ticket as remove_ticket
+from app.services.export_service import database_table_batches
+from app.services.instrumentation import record_cache_hit, set_page, stage
+from app.services.metrics_service import get_table_totals
+from app.services.session_tokens import restore_session
+from app.ui.exports import export_controls
+
+# How often the live tables check for changes made by other users
+REFRESH_SECONDS = 2
+
+# Most audit entries shown under "Recent Changes"
+RECENT_CHANGES_LIMIT = 200
 
 # -----------------------------------------------------------
 # PAGE CONFIG
 # -----------------------------------------------------------
 st.set_page_config(page_title="CRUD Dashboard", layout="wide")
+set_page("CRUD")
 
 # -----------------------------------------------------------
 # AUTHENTICATION
 # -----------------------------------------------------------
+restore_session(st.session_state, st.query_params)
 if not st.session_state.get("logged_in", False):
     st.error("Access denied. Please sign in.")
     if st.button("Return to Login Page"):
@@ -21,98 +41,68 @@ st.title("🛠 CRUD Dashboard")
 st.write("Manage incidents, tickets, and cyber incidents interactively.")
 
 # -----------------------------------------------------------
-# PATHS
+# TABLES
 # -----------------------------------------------------------
-base_dir = Path(__file__).parents[1]
-data_dir = base_dir / "DATA"
-data_dir.mkdir(exist_ok=True)
-
-incidents_db = data_dir / "incidents.db"
-cyber_db = data_dir / "cyber_incidents.db"
-tickets_csv = data_dir / "it_tickets.csv"
+# Both incident lists and the tickets live in the shared database (app/data)
+incidents_table = "incidents"
+cyber_table = "cyber_incidents"
 
 # -----------------------------------------------------------
 # DATABASE FUNCTIONS
 # -----------------------------------------------------------
-def init_db(db_path):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS cyber_incidents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            severity TEXT,
-            status TEXT,
-            date TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-
-def insert_record(db_path, title, severity, status):
-    init_db(db_path)
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO cyber_incidents (title, severity, status) VALUES (?,?,?)",
-        (title, severity, status)
-    )
-    conn.commit()
-    conn.close()
-
-
-def delete_record(db_path, record_id):
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute("DELETE FROM cyber_incidents WHERE id=?", (record_id,))
-    conn.commit()
-    removed = c.rowcount
-    conn.close()
-    return removed
-
-
-def fetch_latest(db_path, limit=10):
-    try:
-        conn = sqlite3.connect(db_path)
-        df = pd.read_sql_query(
-            f"SELECT id, title, severity, status FROM cyber_incidents ORDER BY id DESC LIMIT {limit}",
-            conn
-        )
-        conn.close()
-        return df
-    except Exception:
-        return pd.DataFrame()
+# Every change below is also written to the audit log (app/data/audit.py)
+def current_user():
+    # The signed-in account, not the display name (which Settings lets users change)
+    return st.session_state.get("account")
 
-# -----------------------------------------------------------
-# CSV FUNCTIONS
-# -----------------------------------------------------------
-def ensure_csv(csv_path):
-    if not csv_path.exists():
-        pd.DataFrame(columns=["id", "title", "severity", "status"]).to_csv(csv_path, index=False)
+
+def insert_record(table, title, severity, status):
+    new_id = insert_incident(table, title, severity, status)
+    audit.record(current_user(), "insert", table, new_id,
+                 after={"title": title, "severity": severity, "status": status})
+    return new_id
 
 
+def delete_record(table, record_id):
+    # The deleted row comes back from the same statement, so the log keeps exactly what was removed
+    before = delete_incident(table, int(record_id))
+    if before:
+        audit.record(current_user(), "delete", table, int(record_id), before=before)
+    return 1 if before else 0
+
+
+def fetch_latest(table, limit=10):
+    return list_incidents(table, limit)
+
+# -----------------------------------------------------------
+# TICKET FUNCTIONS
+# -----------------------------------------------------------
 def add_ticket(title, severity, status):
-    ensure_csv(tickets_csv)
-    df = pd.read_csv(tickets_csv)
-    next_id = (df["id"].max() or 0) + 1
-    df.loc[len(df)] = [next_id, title, severity, status]
-    df.to_csv(tickets_csv, index=False)
+    # The form only asks for a title, severity and status, fill in the rest
+    fields = {
+        "priority": severity,
+        "status": status,
+        "category": "General",
+        "subject": title,
+        "description": "",
+        "created_date": date.today().isoformat(),
+        "assigned_to": current_user(),
+    }
+    ticket_id = create_ticket(**fields)
+    audit.record(current_user(), "insert", "tickets", ticket_id, after=fields)
+    return ticket_id
 
 
 def delete_ticket(ticket_id):
-    ensure_csv(tickets_csv)
-    df = pd.read_csv(tickets_csv)
-    before = len(df)
-    df = df[df["id"] != ticket_id]
-    df.to_csv(tickets_csv, index=False)
-    return before - len(df)
+    ticket_id = ticket_id.strip()
+    before = remove_ticket(ticket_id)
+    if before:
+        audit.record(current_user(), "delete", "tickets", ticket_id, before=before)
+    return 1 if before else 0
 
 
 def fetch_tickets(limit=10):
-    ensure_csv(tickets_csv)
-    df = pd.read_csv(tickets_csv)
-    return df.tail(limit)
+    return list_tickets(limit)
 
 
 # -----------------------------------------------------------
@@ -127,16 +117,84 @@ def stat_card(label, value):
     """, unsafe_allow_html=True)
 
 
+# -----------------------------------------------------------
+# LIVE REFRESH
+# Each table below sits in its own fragment that polls the table's version
+# (bumped by triggers, see app/data/schema.py). Rows are only fetched again
+# when that version moves, and only that fragment redraws.
+# -----------------------------------------------------------
+def cached_rows(key, table, loader):
+    """Return (rows, seconds since the change) from the session cache, refetching if stale."""
+    version, changed_at = get_table_versions().get(table, (0, None))
+    cache = st.session_state.setdefault("live_rows", {})
+    entry = cache.get(key)
+    if entry is not None and entry["version"] == version:
+        record_cache_hit(f"query:{key}")
+        return entry["rows"], None
+
+    with stage(f"query:{key}") as rec:
+        rows = loader()
+        rec["rows"] = len(rows)
+    cache[key] = {"version": version, "rows": rows}
+    # Time from the write to this page showing it (only for changes we did not start with)
+    lag = time.time() - changed_at if entry is not None and changed_at else None
+    return rows, lag
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def live_table(key, table, loader):
+    set_page("CRUD")
+    rows, lag = cached_rows(key, table, loader)
+    st.dataframe(rows, use_container_width=True)
+    if lag is not None:
+        st.caption(f"🔄 Updated {lag:.2f}s after the change.")
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def live_stat_cards():
+    set_page("CRUD")
+    versions = get_table_versions()
+    cache = st.session_state.get("live_totals")
+    if cache is None or cache["versions"] != versions:
+        cache = {"versions": versions, "totals": get_table_totals()}
+        st.session_state.live_totals = cache
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        stat_card("Incidents", cache["totals"][incidents_table])
+    with col2:
+        stat_card("Cyber Incidents", cache["totals"][cyber_table])
+    with col3:
+        stat_card("Tickets", cache["totals"]["tickets"])
+
+
 # -----------------------------
 # STATS CARDS
 # -----------------------------
-col1, col2, col3 = st.columns(3)
-with col1:
-    stat_card("Incidents DB Exists", incidents_db.exists())
-with col2:
-    stat_card("Cyber Incidents DB Exists", cyber_db.exists())
-with col3:
-    stat_card("Tickets CSV Exists", tickets_csv.exists())
+live_stat_cards()
+
+# -----------------------------
+# SEARCH
+# -----------------------------
+query = st.text_input("🔎 Search incidents and tickets", key="search",
+                      placeholder="e.g. phishing, vpn outage, ransom…")
+if query.strip():
+    with stage("search") as rec:
+        hits = search(query, limit=50)
+        rec["rows"] = len(hits)
+    if hits:
+        st.dataframe([
+            {
+                "Source": hit["source"],
+                "Key": str(hit["key"]),
+                "Severity": hit["severity"],
+                "Status": hit["status"],
+                "Match": hit["snippet"],
+            }
+            for hit in hits
+        ], use_container_width=True)
+    else:
+        st.caption("No matches.")
 
 st.divider()
 
@@ -157,43 +215,39 @@ with tab_incidents:
         sev = st.selectbox("Severity", ["low", "medium", "high"], key="inc2")
         stat = st.selectbox("Status", ["open", "resolved", "closed"], key="inc3")
         if st.button("Add Incident"):
-            insert_record(incidents_db, title, sev, stat)
+            insert_record(incidents_table, title, sev, stat)
             st.success("Incident added!")
-            st.experimental_rerun()
 
     with st.expander("🗑 Delete Incident"):
         delid = st.number_input("ID to delete", min_value=1, step=1, key="inc_del")
         if st.button("Delete Incident"):
-            removed = delete_record(incidents_db, delid)
+            removed = delete_record(incidents_table, delid)
             st.info(f"Removed: {removed}")
-            st.experimental_rerun()
 
     st.subheader("Latest Incidents")
-    st.dataframe(fetch_latest(incidents_db), use_container_width=True)
+    live_table("incidents", incidents_table, lambda: fetch_latest(incidents_table))
 
 # -----------------------------
 # TAB: TICKETS
 # -----------------------------
 with tab_tickets:
-    st.header("🎫 Manage Tickets (CSV)")
+    st.header("🎫 Manage Tickets")
     with st.expander("➕ Add Ticket"):
         t_title = st.text_input("Ticket Title", key="tic1")
         t_sev = st.selectbox("Severity", ["low", "medium", "high"], key="tic2")
         t_status = st.selectbox("Status", ["open", "closed"], key="tic3")
         if st.button("Add Ticket"):
-            add_ticket(t_title, t_sev, t_status)
-            st.success("Ticket added!")
-            st.experimental_rerun()
+            new_id = add_ticket(t_title, t_sev, t_status)
+            st.success(f"Ticket {new_id} added!")
 
     with st.expander("🗑 Delete Ticket"):
-        tdel = st.number_input("Ticket ID", min_value=1, step=1, key="tic_del")
+        tdel = st.text_input("Ticket ID (e.g. TCK000001)", key="tic_del")
         if st.button("Delete Ticket"):
             removed = delete_ticket(tdel)
             st.info(f"Removed: {removed}")
-            st.experimental_rerun()
 
     st.subheader("Latest Tickets")
-    st.dataframe(fetch_tickets(), use_container_width=True)
+    live_table("tickets", "tickets", fetch_tickets)
 
 # -----------------------------
 # TAB: CYBER INCIDENTS
@@ -205,30 +259,58 @@ with tab_cyber:
         sev2 = st.selectbox("Severity", ["low", "medium", "high"], key="cy2")
         stat2 = st.selectbox("Status", ["open", "resolved", "closed"], key="cy3")
         if st.button("Add Cyber Incident"):
-            insert_record(cyber_db, title2, sev2, stat2)
+            insert_record(cyber_table, title2, sev2, stat2)
             st.success("Cyber Incident added!")
-            st.experimental_rerun()
 
     with st.expander("🗑 Delete Cyber Incident"):
         delid2 = st.number_input("Cyber ID", min_value=1, step=1, key="cy_del")
         if st.button("Delete Cyber"):
-            removed = delete_record(cyber_db, delid2)
+            removed = delete_record(cyber_table, delid2)
             st.info(f"Removed: {removed}")
-            st.experimental_rerun()
 
     st.subheader("Latest Cyber Incidents")
-    st.dataframe(fetch_latest(cyber_db), use_container_width=True)
+    live_table("cyber", cyber_table, lambda: fetch_latest(cyber_table))
 
 # -----------------------------
 # TAB: ALL DATA
 # -----------------------------
 with tab_all:
     st.header("📋 Complete Data Overview")
-    st.subheader("Incidents DB")
-    st.dataframe(fetch_latest(incidents_db, limit=50), use_container_width=True)
-
-    st.subheader("Cyber Incidents DB")
-    st.dataframe(fetch_latest(cyber_db, limit=50), use_container_width=True)
+    st.subheader("Incidents")
+    live_table("all_incidents", incidents_table, lambda: fetch_latest(incidents_table, limit=50))
+
+    st.subheader("Cyber Incidents")
+    live_table("all_cyber", cyber_table, lambda: fetch_latest(cyber_table, limit=50))
+
+    st.subheader("Tickets")
+    live_table("all_tickets", "tickets", lambda: fetch_tickets(limit=50))
+
+    # Full tables, streamed from the database with fetchmany()
+    st.subheader("⬇️ Export")
+    export_table = st.selectbox("Table to export", [incidents_table, cyber_table, "tickets"], key="export_table")
+    export_controls(
+        export_table,
+        export_table,
+        lambda: database_table_batches(export_table),
+        total=get_table_totals()[export_table],
+    )
 
-    st.subheader("Tickets CSV")
-    st.dataframe(fetch_tickets(limit=50), use_container_width=True)
\ No newline at end of file
+    st.subheader("🕒 Recent Changes (last hour)")
+    changes = audit.recent_changes(3600, limit=RECENT_CHANGES_LIMIT)
+    if changes:
+        if len(changes) == RECENT_CHANGES_LIMIT:
+            st.caption(f"Showing the latest {RECENT_CHANGES_LIMIT} changes.")
+        st.dataframe([
+            {
+                "When": time.strftime("%H:%M:%S", time.localtime(c["ts"])),
+                "Who": c["actor"],
+                "Action": c["action"],
+                "Table": c["table"],
+                "Key": str(c["key"]),
+                "Before": json.dumps(c["before"]) if c["before"] else "",
+                "After": json.dumps(c["after"]) if c["after"] else "",
+            }
+            for c in changes
+        ], use_container_width=True)
+    else:
+        st.caption("No changes in the last hour.")
\ No newline at end of file
@@ -1,14 +1,22 @@
 import streamlit as st
-from pathlib import Path
+
+from app.data.blobs import blob_exists, get_blob
+from app.services.image_service import submit_profile_picture
+from app.services.instrumentation import (
+    export_jsonl, export_prometheus, is_enabled, reset, set_enabled, set_page, snapshot
+)
+from app.services.session_tokens import end_session, restore_session
 
 # -----------------------------------------------------------
 # PAGE CONFIG
 # -----------------------------------------------------------
 st.set_page_config(page_title="Settings", layout="wide")
+set_page("Settings")
 
 # -----------------------------------------------------------
 # AUTHENTICATION
 # -----------------------------------------------------------
+restore_session(st.session_state, st.query_params)
 if not st.session_state.get("logged_in", False):
     st.error("Access denied. Please log in first.")
     if st.button("Return to Login Page"):
@@ -70,25 +78,52 @@ with tab_profile:
 with tab_picture:
     st.subheader("Profile Picture")
 
-    if "pfp" not in st.session_state:
-        st.session_state.pfp = None
+    # Session state only keeps blob keys, the images themselves live on disk
+    if "pfp_keys" not in st.session_state:
+        st.session_state.pfp_keys = None
+
+    @st.fragment(run_every=1)
+    def pending_picture():
+        """Show a placeholder and poll until the background job finishes."""
+        job = st.session_state.get("pfp_job")
+        if job is None:
+            return
+        if not job.done():
+            st.info("⏳ Processing your picture...")
+            return
+
+        st.session_state.pfp_job = None
+        try:
+            st.session_state.pfp_keys = job.result()
+        except ValueError as e:
+            st.session_state.pfp_error = str(e)
+        except Exception:
+            st.session_state.pfp_error = "That file could not be processed as an image."
+        st.rerun()
 
-    if st.session_state.pfp:
+    if st.session_state.get("pfp_job") is not None:
+        pending_picture()
+    elif st.session_state.pfp_keys and blob_exists(st.session_state.pfp_keys["medium"]["webp"]):
         card("<center><h4>Your Current Picture</h4></center>")
-        st.image(st.session_state.pfp, width=180)
+        st.image(get_blob(st.session_state.pfp_keys["medium"]["webp"]), width=180)
     else:
         st.info("No profile picture uploaded yet.")
 
+    if st.session_state.get("pfp_error"):
+        st.error(f"⚠ {st.session_state.pop('pfp_error')}")
+
     st.write("### Upload New Picture")
     uploaded_pfp = st.file_uploader("Choose image", type=["jpg", "jpeg", "png"])
 
-    if uploaded_pfp:
-        st.session_state.pfp = uploaded_pfp.read()
-        st.success("✅ Profile picture updated!")
+    # The uploader keeps returning the same file on every rerun, so only handle new ones
+    if uploaded_pfp and uploaded_pfp.file_id != st.session_state.get("pfp_upload_id"):
+        st.session_state.pfp_upload_id = uploaded_pfp.file_id
+        st.session_state.pfp_job = submit_profile_picture(uploaded_pfp.getvalue())
         st.rerun()
 
     if st.button("Remove Profile Picture", key="remove_pfp"):
-        st.session_state.pfp = None
+        st.session_state.pfp_keys = None
+        st.session_state.pfp_job = None
         st.success("✅ Profile picture removed!")
         st.rerun()
 
@@ -103,10 +138,41 @@ with tab_system:
     """)
 
     if st.button("Reset Session", key="reset_session"):
+        end_session(st.session_state, st.query_params)
         st.session_state.clear()
         st.success("✅ Session reset. Please restart the application.")
         st.stop()
 
+    # -------------------------------------------------------
+    # ADMIN ONLY — TIMINGS COLLECTED ACROSS ALL PAGES
+    # -------------------------------------------------------
+    if st.session_state.get("role") == "admin":
+        st.divider()
+        st.write("### ⏱ Performance Timings")
+        st.caption("Latency per page and stage for this server process.")
+
+        collect = st.toggle("Collect timings", value=is_enabled(), key="collect_timings")
+        if collect != is_enabled():
+            set_enabled(collect)
+
+        timings = snapshot()
+        if timings:
+            st.dataframe(timings, use_container_width=True)
+        else:
+            st.info("No timings recorded yet. Turn collection on and use the other pages.")
+
+        col_prom, col_jsonl, col_reset = st.columns(3)
+        with col_prom:
+            st.download_button("Export (Prometheus)", export_prometheus(),
+                               file_name="timings.prom", mime="text/plain")
+        with col_jsonl:
+            st.download_button("Export (JSONL)", export_jsonl(),
+                               file_name="timings.jsonl", mime="application/jsonl")
+        with col_reset:
+            if st.button("Clear Timings", key="clear_timings"):
+                reset()
+                st.rerun()
+
     st.divider()
     st.write("### Optional Features")
     st.info("Here you could add future settings like email update, theme toggle, or notification preferences.")
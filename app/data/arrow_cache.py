@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+try:
+    import fcntl
+except ImportError:  # Windows: conversions are only serialized within one process
+    fcntl = None
+
+from app.data.db import DATA_DIR
+
+# Arrow IPC copies of the CSV files, readable through memory maps
+ARROW_DIR = DATA_DIR / ".arrow"
+
+# Bytes at the start of the CSV, and just before the last parsed byte, that
+# must be unchanged before rows appended since then are parsed on their own
+CHECK_BYTES = 64 * 1024
+
+# Appended rows go into extra segment files; past this many the CSV is
+# converted again from scratch into a single file
+MAX_SEGMENTS = 32
+
+# Tables opened by this process, shared by every session
+_tables = {}
+_lock = threading.Lock()
+
+
+def arrow_path(csv_path):
+    """Common name prefix of a CSV's Arrow files (named after the CSV's full path)."""
+    csv_path = Path(csv_path).resolve()
+    digest = hashlib.sha1(str(csv_path).encode("utf-8")).hexdigest()[:10]
+    return ARROW_DIR / f"{csv_path.stem}-{digest}"
+
+
+# -----------------------------------------------------------
+# MANIFEST
+# A small JSON file per CSV lists its Arrow segment files and how much of
+# the CSV they cover: byte offset, row count and checksums of that part.
+# -----------------------------------------------------------
+def _manifest_path(base):
+    return base.with_name(base.name + ".json")
+
+
+def _read_manifest(base):
+    try:
+        return json.loads(_manifest_path(base).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(base, manifest):
+    path = _manifest_path(base)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(manifest))
+    tmp.replace(path)
+
+
+@contextmanager
+def _converting(base):
+    """One conversion of a given CSV at a time, across threads and worker processes."""
+    base.parent.mkdir(parents=True, exist_ok=True)
+    with open(base.with_name(base.name + ".lock"), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _fingerprint(data, offset):
+    """Checksums of the header line, the first bytes and the bytes just before offset."""
+    head = data[:min(offset, CHECK_BYTES)].to_pybytes()
+    tail = data[max(0, offset - CHECK_BYTES):offset].to_pybytes()
+    header_end = head.find(b"\n")
+    return {
+        "header": hashlib.sha1(head[:header_end] if header_end >= 0 else head).hexdigest(),
+        "head": hashlib.sha1(head).hexdigest(),
+        "tail": hashlib.sha1(tail).hexdigest(),
+    }
+
+
+def _write_segment(base, table):
+    """Write a table to a new, uniquely named Arrow file and return its name.
+
+    Files are never overwritten, so other processes can keep reading the
+    ones they have mapped.
+    """
+    name = f"{base.name}-{secrets.token_hex(4)}.arrow"
+    target = base.with_name(name)
+    tmp = target.with_name(f"{name}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    tmp.replace(target)
+    return name
+
+
+def _remove_old_segments(base, keep):
+    # Before segments, the whole copy was a single "<base>.arrow" file
+    legacy = base.with_name(f"{base.name}.arrow")
+    for path in [legacy, *base.parent.glob(f"{base.name}-*.arrow")]:
+        if path.name not in keep:
+            try:
+                path.unlink()
+            except OSError:  # already gone, or still mapped on Windows
+                pass
+
+
+def _full_convert(base, data, stat):
+    """Parse the whole CSV into a single segment."""
+    table = pa_csv.read_csv(pa.BufferReader(data))
+    name = _write_segment(base, table)
+    manifest = {
+        "segments": [name],
+        "offset": len(data),
+        "rows": table.num_rows,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        **_fingerprint(data, len(data)),
+    }
+    _write_manifest(base, manifest)
+    _remove_old_segments(base, manifest["segments"])
+    return manifest
+
+
+def _can_append(manifest, data):
+    """True if the CSV only grew since the manifest was written.
+
+    The part already parsed must end on a line break, the new part must end
+    on one too (no half-written row), and the header, first bytes and the
+    bytes before the old end must all be unchanged.
+    """
+    offset = manifest["offset"]
+    return (
+        len(manifest["segments"]) < MAX_SEGMENTS
+        and len(data) > offset > 0
+        and data[offset - 1:offset].to_pybytes() == b"\n"
+        and data[len(data) - 1:].to_pybytes() == b"\n"
+        and _fingerprint(data, offset) == {key: manifest[key] for key in ("header", "head", "tail")}
+    )
+
+
+def _append(base, manifest, data, stat, schema):
+    """Parse only the bytes after the manifest's offset and add them as a new segment."""
+    new_rows = pa_csv.read_csv(
+        pa.BufferReader(data[manifest["offset"]:]),
+        read_options=pa_csv.ReadOptions(column_names=schema.names),
+        convert_options=pa_csv.ConvertOptions(column_types=schema),
+    )
+    name = _write_segment(base, new_rows.cast(schema))
+    manifest = {
+        **manifest,
+        "segments": manifest["segments"] + [name],
+        "offset": len(data),
+        "rows": manifest["rows"] + new_rows.num_rows,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        **_fingerprint(data, len(data)),
+    }
+    _write_manifest(base, manifest)
+    return manifest
+
+
+def _segment_schema(base, manifest):
+    with pa.memory_map(str(base.with_name(manifest["segments"][0])), "r") as source:
+        return pa.ipc.open_file(source).schema
+
+
+def convert_csv(csv_path):
+    """Bring the Arrow copy of a CSV up to date and return its manifest.
+
+    Nothing is parsed if the CSV is unchanged. If rows were only appended,
+    only those rows are parsed; anything else converts the whole file again.
+    """
+    base = arrow_path(csv_path)
+    with _converting(base):
+        stat = os.stat(csv_path)
+        manifest = _read_manifest(base)
+        if manifest and (manifest["size"], manifest["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return manifest
+
+        with pa.memory_map(str(csv_path), "r") as source:
+            # Only the bytes present at stat() time, even if the file grows meanwhile
+            data = source.read_buffer(stat.st_size)
+            if manifest and _can_append(manifest, data):
+                try:
+                    return _append(base, manifest, data, stat, _segment_schema(base, manifest))
+                except (OSError, pa.ArrowInvalid):
+                    # e.g. a value that doesn't fit the column types found on the first parse
+                    pass
+            return _full_convert(base, data, stat)
+
+
+def open_table(csv_path):
+    """Return the CSV as a memory-mapped Arrow table.
+
+    The columns point straight into the mapped files, so every session in
+    this process shares one table and every worker process shares the same
+    physical pages through the OS page cache. Slices of it are views, not
+    copies. When the CSV has only grown, the cached table is extended with
+    the new segment instead of being read again.
+    """
+    base = arrow_path(csv_path)
+    for attempt in range(3):
+        segments = convert_csv(csv_path)["segments"]
+        with _lock:
+            cached = _tables.get(base)
+            if cached is not None and cached[0] == segments:
+                return cached[1]
+
+            known = cached[0] if cached is not None and cached[0] == segments[:len(cached[0])] else []
+            parts = [cached[1]] if known else []
+            try:
+                for name in segments[len(known):]:
+                    source = pa.memory_map(str(base.with_name(name)), "r")
+                    parts.append(pa.ipc.open_file(source).read_all())
+            except FileNotFoundError:
+                # Another worker converted the CSV again after we read the manifest
+                if attempt == 2:
+                    raise
+                continue
+            table = pa.concat_tables(parts) if len(parts) > 1 else parts[0]
+            _tables[base] = (segments, table)
+            return table
+
+
+# -----------------------------------------------------------
+# HELPERS THAT WORK ON THE TABLE WITHOUT COPYING IT TO PANDAS
+# -----------------------------------------------------------
+def numeric_columns(table):
+    return [f.name for f in table.schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+
+
+def text_columns(table):
+    """Columns pandas would read as text: strings, plus dates and times.
+
+    Arrow parses dates such as YYYY-MM-DD into date/timestamp columns where
+    pandas left them as strings, so they are still offered as categories.
+    """
+    return [
+        f.name for f in table.schema
+        if pa.types.is_string(f.type) or pa.types.is_large_string(f.type) or pa.types.is_temporal(f.type)
+    ]
+
+
+def filter_contains(table, column, text):
+    """Rows where a column matches a pattern (case-insensitive), like str.contains.
+
+    As with pandas the text is a regular expression (RE2 syntax, so no
+    look-arounds or backreferences). Text that isn't a valid pattern is
+    matched literally instead of failing.
+    """
+    values = table[column]
+    if not (pa.types.is_string(values.type) or pa.types.is_large_string(values.type)):
+        values = pc.cast(values, pa.string())
+    try:
+        mask = pc.match_substring_regex(values, text, ignore_case=True)
+    except pa.ArrowInvalid:
+        mask = pc.match_substring(values, text, ignore_case=True)
+    return table.filter(pc.fill_null(mask, False))
+
+
+def describe_table(table):
+    """Per-column summary similar to DataFrame.describe(include="all")."""
+    rows = []
+    for name in table.column_names:
+        column = table[name]
+        row = {"column": name, "count": len(column) - column.null_count}
+        if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+            min_max = pc.min_max(column)
+            row.update({
+                "mean": pc.mean(column).as_py(),
+                "std": pc.stddev(column, ddof=1).as_py(),
+                "min": min_max["min"].as_py(),
+                "max": min_max["max"].as_py(),
+            })
+        else:
+            row["unique"] = pc.count_distinct(column).as_py()
+        rows.append(row)
+    return rows
+
+
+def sum_by(table, key, value):
+    """Sum of one column grouped by another, returned as a small pandas Series."""
+    grouped = table.select([key, value]).group_by(key).aggregate([(value, "sum")])
+    return grouped.to_pandas().set_index(key)[f"{value}_sum"]
@@ -0,0 +1,182 @@
+import atexit
+import bisect
+import heapq
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from app.data.db import DATA_DIR
+
+# Append-only audit trail: JSON lines in rotating segment files. Each
+# segment has a "<segment>.idx" beside it with one line per written batch:
+# "<newest ts so far> <byte offset> <byte length>"
+AUDIT_DIR = DATA_DIR / "audit"
+
+# Start a new segment once the current one reaches this size
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+
+# The writer waits at most this long to gather a batch before writing it
+FLUSH_INTERVAL = 0.2
+MAX_BATCH = 1000
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+_tiebreak = itertools.count()
+
+
+def record(actor, action, table, key, before=None, after=None):
+    """Queue one audit entry. Returns at once; the disk write happens in the background."""
+    _ensure_writer()
+    _queue.put({
+        "ts": time.time(),
+        "actor": actor,
+        "action": action,
+        "table": table,
+        "key": key,
+        "before": before,
+        "after": after,
+    })
+
+
+def flush():
+    """Block until every queued entry has been written."""
+    if _writer is not None:
+        _queue.join()
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_write_loop, name="audit-writer", daemon=True)
+                _writer.start()
+                atexit.register(flush)
+
+
+def _new_segment():
+    """Segments are named by start time and process id, so workers never share a file."""
+    AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+    return AUDIT_DIR / f"audit-{time.time_ns()}-{os.getpid()}.jsonl"
+
+
+def _write_loop():
+    segment = _new_segment()
+    size, newest = 0, 0.0
+    while True:
+        batch = [_queue.get()]
+        # Group commit: take whatever else arrives within the flush interval
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            data = "".join(json.dumps(entry, default=str) + "\n" for entry in batch).encode("utf-8")
+            with open(segment, "ab") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            # Entries are queued in time order, give or take a few ms between
+            # threads; the running maximum keeps the index sorted regardless
+            newest = max(newest, *(entry["ts"] for entry in batch))
+            with open(f"{segment}.idx", "a", encoding="ascii") as index:
+                index.write(f"{newest!r} {size} {len(data)}\n")
+            size += len(data)
+            if size >= SEGMENT_MAX_BYTES:
+                segment = _new_segment()
+                size, newest = 0, 0.0
+        except OSError:
+            logger.exception("Audit write failed, %d entries lost", len(batch))
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _batches(path, stat):
+    """Return the segment's batches as sorted lists of (newest ts, offset, length).
+
+    Bytes past the last indexed batch (an index write lost in a crash, or
+    a segment from before indexes existed) count as one more batch.
+    """
+    newest, offsets, lengths = [], [], []
+    try:
+        with open(f"{path}.idx", "r", encoding="ascii") as index:
+            for line in index:
+                try:
+                    ts, offset, length = line.split()
+                    newest.append(float(ts))
+                    offsets.append(int(offset))
+                    lengths.append(int(length))
+                except ValueError:
+                    break
+    except OSError:
+        pass
+
+    end = offsets[-1] + lengths[-1] if offsets else 0
+    if end < stat.st_size:
+        newest.append(stat.st_mtime)
+        offsets.append(end)
+        lengths.append(stat.st_size - end)
+    return newest, offsets, lengths
+
+
+def recent_changes(seconds=3600, table=None, limit=200):
+    """Return up to `limit` entries from the last `seconds`, newest first.
+
+    A segment's modification time is its newest entry, so segments last
+    written before the cut-off are skipped without being opened. In the
+    rest, the index finds the first batch that can hold a recent entry by
+    binary search. Segments and batches are read newest first and reading
+    stops once `limit` newer entries are in hand, so the work is bounded by
+    `limit` rather than by how busy the last hour was.
+    """
+    since = time.time() - seconds
+    if not AUDIT_DIR.exists():
+        return []
+
+    segments = []
+    for path in AUDIT_DIR.glob("audit-*.jsonl"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if stat.st_mtime >= since:
+            segments.append((stat.st_mtime, path, stat))
+    segments.sort(reverse=True)
+
+    # Min-heap of the newest `limit` entries; once full, batches older than
+    # its oldest entry are skipped
+    heap = []
+    for _, path, stat in segments:
+        try:
+            newest, offsets, lengths = _batches(path, stat)
+            first = bisect.bisect_left(newest, since)
+            with open(path, "rb") as file:
+                for i in range(len(offsets) - 1, first - 1, -1):
+                    if len(heap) >= limit and newest[i] < heap[0][0]:
+                        break
+                    file.seek(offsets[i])
+                    for line in file.read(lengths[i]).splitlines():
+                        entry = json.loads(line)
+                        if entry["ts"] >= since and (table is None or entry["table"] == table):
+                            item = (entry["ts"], next(_tiebreak), entry)
+                            if len(heap) < limit:
+                                heapq.heappush(heap, item)
+                            elif item > heap[0]:
+                                heapq.heapreplace(heap, item)
+        except (OSError, ValueError):
+            continue
+    return [entry for _, _, entry in sorted(heap, reverse=True)]
@@ -0,0 +1,39 @@
+import hashlib
+import os
+import threading
+
+from app.data.db import DATA_DIR
+
+# Content-addressed storage for binary data (profile pictures etc.)
+BLOB_DIR = DATA_DIR / "blobs"
+
+
+def blob_path(key):
+    """Return the file that holds the blob with this key."""
+    return BLOB_DIR / key[:2] / key
+
+
+def blob_exists(key):
+    """Check whether a blob has already been stored."""
+    return bool(key) and blob_path(key).exists()
+
+
+def put_blob(data):
+    """Store bytes under their SHA-256 hash and return the hash as the key."""
+    key = hashlib.sha256(data).hexdigest()
+    path = blob_path(key)
+
+    # Identical content is only written once
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a private temp file first so readers never see half a blob
+        tmp = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    return key
+
+
+def get_blob(key):
+    """Read the bytes stored under a key."""
+    return blob_path(key).read_bytes()
@@ -0,0 +1,43 @@
+from app.data.db import fetch_all
+
+
+def get_table_versions():
+    """Return {table: (version, changed_at)} for every tracked table.
+
+    version goes up by one on each insert, update or delete (see schema
+    migration 4) and changed_at is the Unix time of the latest change.
+    Tables that have never changed are missing and count as version 0.
+    """
+    rows = fetch_all("SELECT table_name, version, changed_at FROM table_versions")
+    return {row["table_name"]: (row["version"], row["changed_at"]) for row in rows}
+
+
+def get_table_version(table):
+    """Return (version, changed_at) for one table."""
+    return get_table_versions().get(table, (0, None))
+
+
+def read_changed_ids(conn, table, after_seq):
+    """Return (seq, ids) for rows of `table` updated or deleted since change after_seq.
+
+    Call inside the caller's read transaction so the ids match the rows it
+    reads. seq is the newest change so far; pass it back next time. ids is
+    None when after_seq is None or the log no longer reaches back that far
+    (see prune_row_changes), and the caller must then re-read everything.
+    """
+    high = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'row_changes'").fetchone()
+    high = high[0] if high else 0
+    if after_seq is None or after_seq > high:
+        return high, None
+    if after_seq == high:
+        return high, set()
+
+    # Sequence numbers have no gaps, so a missing successor means it was pruned
+    oldest = conn.execute("SELECT MIN(seq) FROM row_changes").fetchone()[0]
+    if oldest is None or oldest > after_seq + 1:
+        return high, None
+    rows = conn.execute(
+        "SELECT row_id FROM row_changes WHERE seq > ? AND seq <= ? AND table_name = ?",
+        (after_seq, high, table)
+    )
+    return high, {row[0] for row in rows}
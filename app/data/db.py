@@ -0,0 +1,140 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+# Every page shares one SQLite database inside DATA/
+DATA_DIR = Path(__file__).resolve().parents[2] / "DATA"
+DB_PATH = Path(os.environ.get("APP_DB_PATH", DATA_DIR / "intelligence_platform.db"))
+
+# Idle connections, one queue per database file
+_pools = {}
+_pools_lock = threading.Lock()
+
+# One writer at a time per database file, within this process
+_writer_locks = {}
+
+
+def connect_database(db_path=None):
+    """Open a new connection with the settings every page relies on."""
+    path = Path(db_path or DB_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers carry on while a write is in progress
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def _get_pool(path):
+    """Return the idle-connection queue for a database, migrating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            # Imported here because schema.py has no need for the pool
+            from app.data.schema import create_all_tables
+
+            conn = connect_database(path)
+            create_all_tables(conn)
+            pool = queue.LifoQueue()
+            pool.put(conn)
+            _pools[path] = pool
+        return pool
+
+
+@contextmanager
+def pooled_connection(db_path=None):
+    """Borrow a connection from the shared pool and give it back afterwards."""
+    path = Path(db_path or DB_PATH)
+    pool = _get_pool(path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = connect_database(path)
+
+    try:
+        yield conn
+    finally:
+        # Never hand a half-finished transaction to the next borrower
+        if conn.in_transaction:
+            conn.rollback()
+        pool.put(conn)
+
+
+@contextmanager
+def write_connection(db_path=None):
+    """Borrow a connection for a write transaction, one writer per database.
+
+    Threads in this process queue on a lock, and worker processes queue on
+    an flock() of a "<db>.writer" file beside the database. Only one
+    writer at a time ever asks SQLite for its lock, so several Streamlit
+    workers never see "database is locked".
+    The transaction commits when the block ends and rolls back on error.
+    """
+    path = Path(db_path or DB_PATH)
+    with _pools_lock:
+        thread_lock = _writer_locks.setdefault(path, threading.Lock())
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with thread_lock, open(f"{path}.writer", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            with pooled_connection(path) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# -----------------------------------------------------------
+# STATEMENT HELPERS
+# sqlite3 keeps compiled statements per connection, so passing the same
+# SQL text with different parameters reuses the prepared statement.
+# -----------------------------------------------------------
+def fetch_all(sql, params=()):
+    """Run a query and return every row as a dict."""
+    with pooled_connection() as conn:
+        return [dict(row) for row in conn.execute(sql, params)]
+
+
+def fetch_one(sql, params=()):
+    """Run a query and return the first row as a dict, or None."""
+    with pooled_connection() as conn:
+        row = conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+
+def fetch_value(sql, params=()):
+    """Run a query and return the first column of the first row."""
+    with pooled_connection() as conn:
+        row = conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+
+def execute(sql, params=()):
+    """Run one write statement in its own transaction and return the cursor."""
+    with write_connection() as conn:
+        return conn.execute(sql, params)
+
+
+def execute_many(sql, rows):
+    """Run one write statement for many rows in a single transaction."""
+    with write_connection() as conn:
+        return conn.executemany(sql, rows).rowcount
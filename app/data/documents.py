@@ -0,0 +1,60 @@
+import json
+
+from app.data.changes import read_changed_ids
+from app.data.db import fetch_all, pooled_connection
+
+# Columns read for each table when building search documents for the chatbot
+DOCUMENT_COLUMNS = {
+    "incidents": ("id", "title", "severity", "status", "date"),
+    "cyber_incidents": ("id", "title", "severity", "status", "date"),
+    "tickets": ("id", "ticket_id", "priority", "status", "category", "subject", "description", "assigned_to"),
+}
+
+
+def read_documents(table, after_id=0, after_seq=None):
+    """Return (last_id, seq, changed, rows) for one table from a single consistent snapshot.
+
+    rows are the DOCUMENT_COLUMNS, in id order, of every row with an id
+    above after_id and of every row updated since change after_seq.
+    changed is the set of ids up to after_id that were updated or deleted
+    since then (deleted ones have no row). If changed is None the change
+    log could not answer (first call, or it was pruned) and rows holds
+    every row of the table. Pass last_id and seq back on the next call.
+    """
+    if table not in DOCUMENT_COLUMNS:
+        raise ValueError(f"Unknown table: {table}")
+    columns = ", ".join(DOCUMENT_COLUMNS[table])
+    with pooled_connection() as conn:
+        conn.execute("BEGIN")
+        seq, changed = read_changed_ids(conn, table, after_seq)
+        if changed is None:
+            after_id = 0
+        last_id = conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] or 0
+        rows = []
+        if changed:
+            # Rows above after_id are read in full below
+            changed = {row_id for row_id in changed if row_id <= after_id}
+            rows = conn.execute(
+                f"SELECT {columns} FROM {table} WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id",
+                (json.dumps(sorted(changed)),)
+            ).fetchall()
+        rows += conn.execute(
+            f"SELECT {columns} FROM {table} WHERE id > ? ORDER BY id", (after_id,)
+        ).fetchall()
+        conn.commit()
+    return max(last_id, after_id), seq, changed, rows
+
+
+def get_documents(table, ids):
+    """Return {id: row} for the given ids of one table."""
+    if table not in DOCUMENT_COLUMNS:
+        raise ValueError(f"Unknown table: {table}")
+    ids = list(ids)
+    if not ids:
+        return {}
+    rows = fetch_all(
+        f"SELECT {', '.join(DOCUMENT_COLUMNS[table])} FROM {table} "
+        f"WHERE id IN ({', '.join('?' for _ in ids)})",
+        ids
+    )
+    return {row["id"]: row for row in rows}
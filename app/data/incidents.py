@@ -0,0 +1,101 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from app.data.db import execute, execute_many, fetch_all, fetch_value, write_connection
+
+# General incidents and cyber incidents share the same columns
+INCIDENT_TABLES = ("incidents", "cyber_incidents")
+
+
+def _check_table(table):
+    """Table names can't be bound as parameters, so only allow known ones."""
+    if table not in INCIDENT_TABLES:
+        raise ValueError(f"Unknown incident table: {table}")
+
+
+def insert_incident(table, title, severity, status):
+    """Add one incident and return its id."""
+    _check_table(table)
+    cur = execute(
+        f"INSERT INTO {table} (title, severity, status) VALUES (?, ?, ?)",
+        (title, severity, status)
+    )
+    return cur.lastrowid
+
+
+def insert_incidents(table, rows):
+    """Add many (title, severity, status) rows in one transaction."""
+    _check_table(table)
+    return execute_many(
+        f"INSERT INTO {table} (title, severity, status) VALUES (?, ?, ?)",
+        rows
+    )
+
+
+def delete_incident(table, incident_id):
+    """Remove an incident and return the deleted row as a dict, or None if there was none.
+
+    The row comes from DELETE ... RETURNING, so it is exactly what was
+    removed, with no separate read.
+    """
+    _check_table(table)
+    with write_connection() as conn:
+        row = conn.execute(f"DELETE FROM {table} WHERE id = ? RETURNING *", (incident_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def list_incidents(table, limit=10):
+    """Return the most recent incidents, newest first."""
+    _check_table(table)
+    return fetch_all(
+        f"SELECT id, title, severity, status, date FROM {table} ORDER BY id DESC LIMIT ?",
+        (limit,)
+    )
+
+
+def count_incidents(table):
+    """Return how many incidents a table holds."""
+    _check_table(table)
+    return fetch_value(f"SELECT COUNT(*) FROM {table}")
+
+
+def import_legacy_incidents(table, legacy_path):
+    """Copy incidents from an old per-list SQLite file and return how many were added.
+
+    The old CRUD page kept each list in its own file (DATA/incidents.db,
+    DATA/cyber_incidents.db), both with a cyber_incidents table. The
+    highest legacy id copied is remembered in legacy_imports, so running
+    this again only brings over rows added since.
+    """
+    _check_table(table)
+    legacy_path = Path(legacy_path)
+    source = legacy_path.name
+    last_id = fetch_value("SELECT last_id FROM legacy_imports WHERE source = ?", (source,)) or 0
+
+    uri = f"{legacy_path.resolve().as_uri()}?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as legacy:
+        rows = legacy.execute(
+            "SELECT id, title, severity, status, date FROM cyber_incidents WHERE id > ? ORDER BY id",
+            (last_id,)
+        ).fetchall()
+    if not rows:
+        return 0
+
+    with write_connection() as conn:
+        # Another process may have imported some of these meanwhile
+        done = conn.execute("SELECT last_id FROM legacy_imports WHERE source = ?", (source,)).fetchone()
+        rows = [row for row in rows if row[0] > (done[0] if done else 0)]
+        if not rows:
+            return 0
+        conn.executemany(
+            f"INSERT INTO {table} (title, severity, status, date) "
+            "VALUES (?, ?, ?, coalesce(?, CURRENT_TIMESTAMP))",
+            [row[1:] for row in rows]
+        )
+        conn.execute(
+            "INSERT INTO legacy_imports (source, last_id) VALUES (?, ?) "
+            "ON CONFLICT (source) DO UPDATE SET last_id = excluded.last_id",
+            (source, rows[-1][0])
+        )
+    return len(rows)
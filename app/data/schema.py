@@ -0,0 +1,302 @@
+def _counter_triggers(table, severity_column):
+    """Triggers that keep status_counts in step with one table.
+
+    Every insert, delete or status/severity change adjusts the matching
+    counter row and today's entry in status_count_changes.
+    """
+    def bump(row, sign):
+        key = (
+            f"'{table}', lower(coalesce({row}.status, '')), "
+            f"lower(coalesce({row}.{severity_column}, ''))"
+        )
+        return (
+            f"INSERT INTO status_counts (source, status, severity, n) VALUES ({key}, {sign}) "
+            f"ON CONFLICT (source, status, severity) DO UPDATE SET n = n + ({sign}); "
+            f"INSERT INTO status_count_changes (day, source, status, severity, delta) "
+            f"VALUES (date('now'), {key}, {sign}) "
+            f"ON CONFLICT (day, source, status, severity) DO UPDATE SET delta = delta + ({sign});"
+        )
+
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table} "
+        f"BEGIN {bump('NEW', 1)} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table} "
+        f"BEGIN {bump('OLD', -1)} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_count_update "
+        f"AFTER UPDATE OF status, {severity_column} ON {table} "
+        f"BEGIN {bump('OLD', -1)} {bump('NEW', 1)} END",
+    ]
+
+
+# Tables whose rows are counted in status_counts, with their severity column
+COUNTED_TABLES = {"incidents": "severity", "cyber_incidents": "severity", "tickets": "priority"}
+
+
+def counter_seed_sql(table, severity_column):
+    """SQL that fills status_counts for one table from scratch."""
+    return (
+        f"INSERT INTO status_counts (source, status, severity, n) "
+        f"SELECT '{table}', lower(coalesce(status, '')), lower(coalesce({severity_column}, '')), COUNT(*) "
+        f"FROM {table} GROUP BY 2, 3"
+    )
+
+
+def _version_triggers(table):
+    """Triggers that bump a table's entry in table_versions on every change."""
+    bump = (
+        f"INSERT INTO table_versions (table_name, version, changed_at) "
+        f"VALUES ('{table}', 1, (julianday('now') - 2440587.5) * 86400.0) "
+        f"ON CONFLICT (table_name) DO UPDATE SET "
+        f"version = version + 1, changed_at = excluded.changed_at;"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()} "
+        f"AFTER {event} ON {table} BEGIN {bump} END"
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+def _month_count_triggers():
+    """Triggers that keep ticket_month_counts in step with the tickets table."""
+    def bump(row, sign):
+        return (
+            f"INSERT INTO ticket_month_counts (month, priority, n) "
+            f"VALUES (coalesce(substr({row}.created_date, 1, 7), ''), coalesce({row}.priority, ''), {sign}) "
+            f"ON CONFLICT (month, priority) DO UPDATE SET n = n + ({sign});"
+        )
+
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_tickets_month_insert AFTER INSERT ON tickets "
+        f"BEGIN {bump('NEW', 1)} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_tickets_month_delete AFTER DELETE ON tickets "
+        f"BEGIN {bump('OLD', -1)} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_tickets_month_update "
+        f"AFTER UPDATE OF created_date, priority ON tickets "
+        f"BEGIN {bump('OLD', -1)} {bump('NEW', 1)} END",
+    ]
+
+
+def _change_log_triggers(table):
+    """Triggers that note each updated or deleted row of a table in row_changes."""
+    log = (
+        f"INSERT INTO row_changes (table_name, row_id, changed_at) "
+        f"VALUES ('{table}', OLD.id, (julianday('now') - 2440587.5) * 86400.0);"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_changelog_{event.lower()} "
+        f"AFTER {event} ON {table} BEGIN {log} END"
+        for event in ("UPDATE", "DELETE")
+    ]
+
+
+# Text columns indexed for full-text search, per table
+SEARCH_COLUMNS = {
+    "incidents": ("title",),
+    "cyber_incidents": ("title",),
+    "tickets": ("subject", "description"),
+}
+
+
+def _search_index(table, columns):
+    """An external-content FTS5 index over `columns`, kept in sync by triggers.
+
+    The index stores only the tokens; the text itself is read back from the
+    table by rowid, so it adds little to the file size.
+    """
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"NEW.{c}" for c in columns)
+    old = ", ".join(f"OLD.{c}" for c in columns)
+    remove = f"INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old});"
+    add = f"INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new});"
+    return [
+        # prefix='2 3' indexes short prefixes too, so a search for "ke*" does
+        # not have to merge every term starting with "ke" (costs some write speed)
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table} BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table} BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update AFTER UPDATE OF {cols} ON {table} "
+        f"BEGIN {remove} {add} END",
+        # Index the rows that existed before the triggers
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+    ]
+
+
+# Each migration is a list of statements. The position in MIGRATIONS is the
+# schema version it produces, stored in SQLite's user_version pragma.
+MIGRATIONS = [
+    # 1 — users, tickets and the two incident tables
+    [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL DEFAULT 'user',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id TEXT NOT NULL UNIQUE,
+            priority TEXT,
+            status TEXT,
+            category TEXT,
+            subject TEXT,
+            description TEXT,
+            created_date TEXT,
+            resolved_date TEXT,
+            assigned_to TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS incidents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            severity TEXT,
+            status TEXT,
+            date TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS cyber_incidents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            severity TEXT,
+            status TEXT,
+            date TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ],
+    # 2 — indexes behind the filtered ticket lists and dashboard counts
+    [
+        "CREATE INDEX IF NOT EXISTS idx_tickets_status_priority ON tickets (status, priority)",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_assigned_status ON tickets (assigned_to, status)",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets (created_date)",
+    ],
+    # 3 — summary tables for the dashboard KPIs, kept current by triggers
+    [
+        """
+        CREATE TABLE IF NOT EXISTS status_counts (
+            source TEXT NOT NULL,
+            status TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            n INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, status, severity)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS status_count_changes (
+            day TEXT NOT NULL,
+            source TEXT NOT NULL,
+            status TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            delta INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, source, status, severity)
+        ) WITHOUT ROWID
+        """,
+        *[
+            statement
+            for table, severity_column in COUNTED_TABLES.items()
+            for statement in _counter_triggers(table, severity_column)
+        ],
+        # Seed the counters from rows that existed before the triggers
+        *[counter_seed_sql(table, severity_column) for table, severity_column in COUNTED_TABLES.items()],
+    ],
+    # 4 — per-table change counters so pages only re-query what changed
+    [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            changed_at REAL
+        ) WITHOUT ROWID
+        """,
+        *[statement for table in COUNTED_TABLES for statement in _version_triggers(table)],
+    ],
+    # 5 — full-text search over incident titles and ticket text
+    [
+        statement
+        for table, columns in SEARCH_COLUMNS.items()
+        for statement in _search_index(table, columns)
+    ],
+    # 6 — revoked session tokens (see app/services/session_tokens.py)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            token_id TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID
+        """,
+    ],
+    # 7 — tickets per created month and priority, for the Analytics charts.
+    # NULLs are stored as '' so they share one counter row.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS ticket_month_counts (
+            month TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            n INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, priority)
+        ) WITHOUT ROWID
+        """,
+        *_month_count_triggers(),
+        """
+        INSERT INTO ticket_month_counts (month, priority, n)
+        SELECT coalesce(substr(created_date, 1, 7), ''), coalesce(priority, ''), COUNT(*)
+        FROM tickets GROUP BY 1, 2
+        """,
+    ],
+    # 8 — log of updated and deleted rows, so in-memory caches can refresh
+    # just those rows. New rows are found by id; old entries are pruned.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS row_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            changed_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_row_changes_changed_at ON row_changes (changed_at)",
+        *[statement for table in COUNTED_TABLES for statement in _change_log_triggers(table)],
+    ],
+    # 9 — how far each legacy incidents .db file has been copied in (see main.py)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS legacy_imports (
+            source TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn):
+    """Return the migration number the database is currently at."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def create_all_tables(conn):
+    """Apply any migrations the database has not seen yet."""
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return
+
+    # Take the write lock first so two processes never migrate at once
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = get_schema_version(conn)
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
@@ -0,0 +1,70 @@
+import re
+
+from app.data.db import execute, fetch_all
+from app.data.schema import SEARCH_COLUMNS
+
+# Markers placed around matched words in snippets
+HIGHLIGHT = ("[", "]")
+
+# What each source shows as its key and its severity
+_KEY_COLUMN = {"incidents": "id", "cyber_incidents": "id", "tickets": "ticket_id"}
+_SEVERITY_COLUMN = {"incidents": "severity", "cyber_incidents": "severity", "tickets": "priority"}
+
+# Only this many of the newest matches per source are ranked. A word found
+# in most rows would otherwise have every one of them scored.
+MAX_CANDIDATES = 5000
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def build_query(text):
+    """Turn free text into an FTS5 query.
+
+    Every word must match; the last one also matches as a prefix so results
+    appear while the user is still typing. Words are quoted so FTS5 operators
+    typed by the user are treated as plain text.
+    """
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(text, tables=None, limit=20):
+    """Return the best matches for `text`, best first.
+
+    Each hit is a dict with source, key, severity, status, snippet and rank
+    (bm25, lower is better). Ranking covers the newest MAX_CANDIDATES
+    matches of each source.
+    """
+    query = build_query(text)
+    if query is None:
+        return []
+
+    hits = []
+    for table in tables or SEARCH_COLUMNS:
+        if table not in SEARCH_COLUMNS:
+            raise ValueError(f"Unknown search source: {table}")
+        fts = f"{table}_fts"
+        hits.extend(fetch_all(
+            f"SELECT '{table}' AS source, t.{_KEY_COLUMN[table]} AS key, "
+            f"t.{_SEVERITY_COLUMN[table]} AS severity, t.status AS status, "
+            f"snippet({fts}, -1, ?, ?, '…', 12) AS snippet, bm25({fts}) AS rank "
+            f"FROM {fts} JOIN {table} t ON t.id = {fts}.rowid "
+            f"WHERE {fts} MATCH ? AND {fts}.rowid >= ("
+            f"  SELECT coalesce(min(rowid), 0) FROM ("
+            f"    SELECT rowid FROM {fts} WHERE {fts} MATCH ? ORDER BY rowid DESC LIMIT ?)) "
+            f"ORDER BY rank LIMIT ?",
+            (*HIGHLIGHT, query, query, MAX_CANDIDATES, limit)
+        ))
+    hits.sort(key=lambda hit: hit["rank"])
+    return hits[:limit]
+
+
+def rebuild_index(table):
+    """Re-index a table from scratch, e.g. after a bulk load with triggers off."""
+    if table not in SEARCH_COLUMNS:
+        raise ValueError(f"Unknown search source: {table}")
+    execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
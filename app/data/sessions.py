@@ -0,0 +1,20 @@
+import time
+
+from app.data.db import fetch_all, write_connection
+
+
+def revoke_token_id(token_id, expires_at):
+    """Mark a session token as revoked until it would have expired anyway."""
+    with write_connection() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO revoked_tokens (token_id, expires_at) VALUES (?, ?)",
+            (token_id, expires_at)
+        )
+        # Expired tokens fail verification on their own, so drop them here
+        conn.execute("DELETE FROM revoked_tokens WHERE expires_at < ?", (time.time(),))
+
+
+def list_revoked_token_ids():
+    """Return the ids of revoked tokens that have not expired yet."""
+    rows = fetch_all("SELECT token_id FROM revoked_tokens WHERE expires_at >= ?", (time.time(),))
+    return {row["token_id"] for row in rows}
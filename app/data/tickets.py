@@ -0,0 +1,239 @@
+import csv
+import json
+
+from app.data.changes import read_changed_ids
+from app.data.db import (
+    execute, execute_many, fetch_all, fetch_one, fetch_value, pooled_connection, write_connection
+)
+
+TICKET_COLUMNS = (
+    "ticket_id", "priority", "status", "category", "subject",
+    "description", "created_date", "resolved_date", "assigned_to",
+)
+
+_INSERT_SQL = (
+    f"INSERT INTO tickets ({', '.join(TICKET_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in TICKET_COLUMNS)})"
+)
+
+
+def insert_ticket(ticket_id, priority, status, category, subject, description,
+                  created_date, resolved_date=None, assigned_to=None):
+    """Add one ticket and return its row id."""
+    cur = execute(_INSERT_SQL, (
+        ticket_id, priority, status, category, subject,
+        description, created_date, resolved_date, assigned_to,
+    ))
+    return cur.lastrowid
+
+
+def insert_tickets(rows):
+    """Add many tickets (dicts keyed by column name) in one transaction.
+
+    Rows whose ticket_id already exists are skipped.
+    """
+    return execute_many(
+        _INSERT_SQL.replace("INSERT", "INSERT OR IGNORE", 1),
+        [tuple(row.get(col) for col in TICKET_COLUMNS) for row in rows]
+    )
+
+
+def ticket_exists(ticket_id):
+    """Check whether a ticket id is already in use."""
+    return fetch_value("SELECT 1 FROM tickets WHERE ticket_id = ?", (ticket_id,)) is not None
+
+
+def get_ticket(ticket_id):
+    """Return one ticket as a dict, or None."""
+    return fetch_one("SELECT * FROM tickets WHERE ticket_id = ?", (ticket_id,))
+
+
+# Columns that may be grouped on; anything else would be an SQL injection risk
+GROUPABLE_COLUMNS = ("priority", "status", "category", "assigned_to")
+
+
+def _ticket_filters(status=None, priority=None, assigned_to=None, category=None,
+                    created_from=None, created_to=None):
+    """Build a WHERE clause that lines up with the ticket indexes."""
+    clauses = []
+    params = []
+    for column, value in (("status", status), ("priority", priority),
+                          ("assigned_to", assigned_to), ("category", category)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    # ISO dates compare correctly as text, so this is a range scan on idx_tickets_created
+    if created_from is not None:
+        clauses.append("created_date >= ?")
+        params.append(created_from)
+    if created_to is not None:
+        clauses.append("created_date < ?")
+        params.append(created_to)
+
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def list_tickets(limit=None, offset=0, before_id=None, **filters):
+    """Return tickets newest first, optionally filtered and paged.
+
+    Filters: status, priority, assigned_to, category, created_from, created_to.
+    For deep pages pass the last id seen as before_id instead of a large offset.
+    """
+    where, params = _ticket_filters(**filters)
+    if before_id is not None:
+        where += " AND id < ?" if where else " WHERE id < ?"
+        params.append(before_id)
+
+    sql = f"SELECT * FROM tickets{where} ORDER BY id DESC"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    return fetch_all(sql, params)
+
+
+def count_tickets(**filters):
+    """Return how many tickets match the filters, without loading any rows."""
+    where, params = _ticket_filters(**filters)
+    return fetch_value(f"SELECT COUNT(*) FROM tickets{where}", params)
+
+
+def count_tickets_by(column, **filters):
+    """Return {value: count} for one column, e.g. tickets per priority.
+
+    Unfiltered counts per priority come from the ticket_month_counts
+    summary table instead of scanning the tickets.
+    """
+    if column not in GROUPABLE_COLUMNS:
+        raise ValueError(f"Cannot group tickets by {column}")
+    if column == "priority" and not filters:
+        rows = fetch_all(
+            "SELECT NULLIF(priority, '') AS value, SUM(n) AS n FROM ticket_month_counts "
+            "GROUP BY priority HAVING SUM(n) > 0"
+        )
+        return {row["value"]: row["n"] for row in rows}
+    where, params = _ticket_filters(**filters)
+    rows = fetch_all(
+        f"SELECT {column} AS value, COUNT(*) AS n FROM tickets{where} GROUP BY {column}",
+        params
+    )
+    return {row["value"]: row["n"] for row in rows}
+
+
+def count_tickets_by_month(**filters):
+    """Return {"YYYY-MM": count}.
+
+    Unfiltered, or filtered by priority only, this reads the
+    ticket_month_counts summary table; other filters use the created_date index.
+    """
+    if not filters.keys() - {"priority"}:
+        where = " AND priority = ?" if filters.get("priority") is not None else ""
+        params = [filters["priority"]] if where else []
+        rows = fetch_all(
+            "SELECT month, SUM(n) AS n FROM ticket_month_counts "
+            f"WHERE month != ''{where} GROUP BY month HAVING SUM(n) > 0 ORDER BY month",
+            params
+        )
+        return {row["month"]: row["n"] for row in rows}
+    where, params = _ticket_filters(**filters)
+    where += " AND created_date IS NOT NULL" if where else " WHERE created_date IS NOT NULL"
+    rows = fetch_all(
+        f"SELECT substr(created_date, 1, 7) AS month, COUNT(*) AS n FROM tickets{where} "
+        "GROUP BY month ORDER BY month",
+        params
+    )
+    return {row["month"]: row["n"] for row in rows}
+
+
+# Columns needed to work out how long a ticket took to resolve
+RESOLUTION_COLUMNS = ("priority", "category", "assigned_to", "created_date", "resolved_date")
+
+
+def read_resolution_changes(after_id=0, after_seq=None):
+    """Return (last_id, seq, changed, rows) from one consistent snapshot.
+
+    rows holds id plus RESOLUTION_COLUMNS for every resolved ticket that
+    is new (row id above after_id) or was updated since change after_seq.
+    changed is the set of row ids up to after_id that were updated or
+    deleted since then, whose earlier state the caller should forget.
+    If changed is None the change log could not answer (first call, or it
+    was pruned) and rows holds every resolved ticket instead. Pass last_id
+    and seq back on the next call.
+    """
+    columns = ", ".join(("id", *RESOLUTION_COLUMNS))
+    with pooled_connection() as conn:
+        conn.execute("BEGIN")
+        seq, changed = read_changed_ids(conn, "tickets", after_seq)
+        if changed is None:
+            after_id = 0
+        last_id = conn.execute("SELECT MAX(id) FROM tickets").fetchone()[0] or 0
+        rows = conn.execute(
+            f"SELECT {columns} FROM tickets WHERE id > ? AND resolved_date IS NOT NULL",
+            (after_id,)
+        ).fetchall()
+        if changed:
+            # Rows above after_id were just read in full
+            changed = {row_id for row_id in changed if row_id <= after_id}
+            rows += conn.execute(
+                f"SELECT {columns} FROM tickets "
+                "WHERE id IN (SELECT value FROM json_each(?)) AND resolved_date IS NOT NULL",
+                (json.dumps(sorted(changed)),)
+            ).fetchall()
+        conn.commit()
+    return max(last_id, after_id), seq, changed, rows
+
+
+def create_ticket(priority, status, category, subject, description, created_date,
+                  resolved_date=None, assigned_to=None, prefix="TCK"):
+    """Add a ticket under the next free id and return that id.
+
+    The id is picked inside the write transaction, so two users adding
+    tickets at the same moment never get the same one.
+    """
+    with write_connection() as conn:
+        number = (conn.execute("SELECT MAX(id) FROM tickets").fetchone()[0] or 0) + 1
+        # Imported tickets may already use ids in this format
+        while conn.execute("SELECT 1 FROM tickets WHERE ticket_id = ?",
+                           (f"{prefix}{number:06d}",)).fetchone():
+            number += 1
+        ticket_id = f"{prefix}{number:06d}"
+        conn.execute(_INSERT_SQL, (
+            ticket_id, priority, status, category, subject,
+            description, created_date, resolved_date, assigned_to,
+        ))
+    return ticket_id
+
+
+def update_ticket_status(ticket_id, status, resolved_date=None):
+    """Change a ticket's status and return how many rows were updated."""
+    return execute(
+        "UPDATE tickets SET status = ?, resolved_date = ? WHERE ticket_id = ?",
+        (status, resolved_date, ticket_id)
+    ).rowcount
+
+
+def delete_ticket(ticket_id):
+    """Remove a ticket and return the deleted row as a dict, or None if there was none.
+
+    The row comes from DELETE ... RETURNING, so it is exactly what was
+    removed, with no separate read.
+    """
+    with write_connection() as conn:
+        row = conn.execute("DELETE FROM tickets WHERE ticket_id = ? RETURNING *", (ticket_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def import_tickets_csv(csv_path, batch_size=5000):
+    """Load tickets from a CSV export, skipping ticket ids already stored."""
+    added = 0
+    batch = []
+    with open(csv_path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            # Empty cells become NULL rather than empty strings
+            batch.append({col: (row.get(col) or None) for col in TICKET_COLUMNS})
+            if len(batch) >= batch_size:
+                added += insert_tickets(batch)
+                batch = []
+    if batch:
+        added += insert_tickets(batch)
+    return added
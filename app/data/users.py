@@ -0,0 +1,36 @@
+from app.data.db import execute, execute_many, fetch_one, fetch_value
+
+
+def user_exists(username):
+    """Check whether a username is already registered."""
+    return fetch_value("SELECT 1 FROM users WHERE username = ?", (username,)) is not None
+
+
+def get_user(username):
+    """Return a user row as a dict, or None if the username is unknown."""
+    return fetch_one(
+        "SELECT id, username, password_hash, role FROM users WHERE username = ?",
+        (username,)
+    )
+
+
+def insert_user(username, password_hash, role="user"):
+    """Add a user whose password has already been hashed."""
+    cur = execute(
+        "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+        (username, password_hash, role)
+    )
+    return cur.lastrowid
+
+
+def insert_users(rows):
+    """Add many (username, password_hash, role) rows, skipping existing usernames."""
+    return execute_many(
+        "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+        rows
+    )
+
+
+def delete_user(username):
+    """Remove a user and return how many rows were deleted."""
+    return execute("DELETE FROM users WHERE username = ?", (username,)).rowcount
@@ -0,0 +1,72 @@
+import os
+import re
+import zlib
+
+import numpy as np
+
+from app.services.llm_service import get_openai_client
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _normalise(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class HashingEmbedder:
+    """Local, deterministic embeddings from hashed words.
+
+    Needs no network or model download and gives the same vectors in every
+    process, so it suits tests and offline use. It matches shared words,
+    not meaning.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts):
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for word in _TOKEN.findall(text.lower()):
+                # crc32 rather than hash(), which changes between processes
+                h = zlib.crc32(word.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+
+        vectors = np.zeros((len(texts), self.dim), dtype="float32")
+        np.add.at(vectors, (np.array(rows, dtype="int64"), np.array(cols, dtype="int64")),
+                  np.array(signs, dtype="float32"))
+        return _normalise(vectors)
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API, requested in batches."""
+
+    def __init__(self, api_key, model="text-embedding-3-small", dim=256, batch_size=512):
+        self.client = get_openai_client(api_key)
+        self.model = model
+        self.dim = dim
+        self.batch_size = batch_size
+        self.name = f"openai-{model}-{dim}"
+
+    def embed(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = self.client.embeddings.create(
+                model=self.model, input=list(texts[start:start + self.batch_size]), dimensions=self.dim
+            )
+            vectors.extend(item.embedding for item in response.data)
+        return _normalise(np.array(vectors, dtype="float32").reshape(len(texts), self.dim))
+
+
+def get_embedder(api_key=None):
+    """Return the embedder chosen by APP_EMBEDDER ("hashing" by default, or "openai")."""
+    kind = os.environ.get("APP_EMBEDDER", "hashing")
+    if kind == "openai":
+        return OpenAIEmbedder(api_key or os.environ["OPENAI_API_KEY"])
+    if kind == "hashing":
+        return HashingEmbedder()
+    raise ValueError(f"Unknown embedder: {kind}")
@@ -0,0 +1,172 @@
+import gzip
+import os
+import re
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from app.data.arrow_cache import filter_contains
+from app.data.db import DATA_DIR, pooled_connection
+from app.data.incidents import INCIDENT_TABLES
+
+# Finished exports are written here and removed after EXPORT_MAX_AGE seconds
+EXPORT_DIR = DATA_DIR / "exports"
+EXPORT_MAX_AGE = 24 * 3600
+
+FORMATS = {"csv.gz": "application/gzip", "parquet": "application/vnd.apache.parquet"}
+
+# Rows held in memory at once, whatever the size of the export
+BATCH_ROWS = 64 * 1024
+
+EXPORTABLE_TABLES = (*INCIDENT_TABLES, "tickets")
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export")
+
+
+# -----------------------------------------------------------
+# SOURCES
+# Each yields (batch of rows to write, source rows read for that batch).
+# A source with no rows still yields one empty batch, so the file gets
+# its header (CSV) or schema (Parquet).
+# -----------------------------------------------------------
+def _empty_batch(schema):
+    return pa.RecordBatch.from_pylist([], schema=schema), 0
+
+
+def table_batches(table, column=None, text=None, batch_size=BATCH_ROWS):
+    """Stream an Arrow table (e.g. a memory-mapped CSV copy), optionally filtered."""
+    batches = table.to_batches(max_chunksize=batch_size)
+    if not batches:
+        yield _empty_batch(table.schema)
+    for batch in batches:
+        yield (filter_contains(batch, column, text) if text else batch), batch.num_rows
+
+
+def csv_batches(csv_path, batch_size=BATCH_ROWS):
+    """Stream a CSV file straight from disk, at most batch_size rows at a time."""
+    reader = pa_csv.open_csv(csv_path, read_options=pa_csv.ReadOptions(block_size=1 << 20))
+    empty = True
+    for block in reader:
+        empty = False
+        # A 1 MB block holds however many rows fit, so cut it to batch_size
+        for start in range(0, block.num_rows, batch_size):
+            batch = block.slice(start, batch_size)
+            yield batch, batch.num_rows
+    if empty:
+        yield _empty_batch(reader.schema)
+
+
+def query_batches(sql, params=(), batch_size=BATCH_ROWS):
+    """Stream the result of a query with fetchmany().
+
+    Column types come from the first batch; columns that are all NULL there,
+    or every column if there are no rows, are exported as text.
+    """
+    with pooled_connection() as conn:
+        cur = conn.execute(sql, params)
+        names = [d[0] for d in cur.description]
+        schema = None
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            if schema is None:
+                arrays = [pa.array(col) for col in columns]
+                schema = pa.schema([
+                    (name, pa.string() if pa.types.is_null(array.type) else array.type)
+                    for name, array in zip(names, arrays)
+                ])
+            yield pa.record_batch(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+            ), len(rows)
+        if schema is None:
+            yield _empty_batch(pa.schema([(name, pa.string()) for name in names]))
+
+
+def database_table_batches(table, batch_size=BATCH_ROWS):
+    """Stream every row of one of the app's tables, newest first."""
+    if table not in EXPORTABLE_TABLES:
+        raise ValueError(f"Cannot export table: {table}")
+    return query_batches(f"SELECT * FROM {table} ORDER BY id DESC", batch_size=batch_size)
+
+
+# -----------------------------------------------------------
+# WRITING
+# -----------------------------------------------------------
+def _write(batches, job):
+    """Write batches to the job's file as they arrive, then move it into place.
+
+    The first batch fixes the file's schema, so even an export with no
+    rows is a readable file. A source that yields nothing is refused.
+    """
+    path = job["path"]
+    partial = path.with_name(path.name + ".part")
+    writer = None
+    try:
+        with open(partial, "wb") as raw:
+            sink = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) if job["format"] == "csv.gz" else raw
+            for batch, read in batches:
+                if writer is None:
+                    writer = (
+                        pa_csv.CSVWriter(sink, batch.schema) if job["format"] == "csv.gz"
+                        else pq.ParquetWriter(sink, batch.schema, compression="zstd")
+                    )
+                writer.write_batch(batch)
+                job["rows"] += batch.num_rows
+                job["read"] += read
+            if writer is None:
+                raise ValueError("Nothing to export: the source produced no columns")
+            writer.close()
+            if sink is not raw:
+                sink.close()
+        os.replace(partial, path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+    return path
+
+
+def _remove_old_exports():
+    cutoff = time.time() - EXPORT_MAX_AGE
+    for old in EXPORT_DIR.glob("*"):
+        try:
+            if old.stat().st_mtime < cutoff:
+                old.unlink()
+        except OSError:
+            pass
+
+
+def start_export(batches, name, fmt="csv.gz", total=None):
+    """Write batches to DATA/exports on a worker thread and return a job dict.
+
+    The job's rows/read counters move as the export runs; total (source
+    rows, if known) lets the caller show progress. job["future"] finishes
+    with the file path, or raises if the export failed.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    _remove_old_exports()
+
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "export"
+    job = {
+        "path": EXPORT_DIR / f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}.{fmt}",
+        "format": fmt,
+        "rows": 0,
+        "read": 0,
+        "total": total,
+    }
+    job["future"] = _executor.submit(_write, batches, job)
+    return job
+
+
+def job_progress(job):
+    """Fraction of the source read so far, or None if the size is unknown."""
+    if not job["total"]:
+        return None
+    return min(job["read"] / job["total"], 1.0)
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from app.data.blobs import put_blob
+
+# Pillow is imported inside the functions below. They only run on the
+# worker threads, so opening the Settings page doesn't load it.
+
+# Longest side of each stored profile picture size, in pixels
+PROFILE_SIZES = {"small": 64, "medium": 180, "large": 360}
+
+# Refuse anything bigger than this before decoding it fully
+MAX_PIXELS = 40_000_000
+
+# Shared by every session in this process, so uploads never run on the script thread
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pfp")
+
+
+def validate_image(data):
+    """Raise ValueError if the bytes are not a reasonably sized image."""
+    from PIL import Image
+
+    try:
+        with Image.open(BytesIO(data)) as img:
+            if img.width * img.height > MAX_PIXELS:
+                raise ValueError("Image is too large.")
+            img.verify()
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError("File is not a valid image.") from e
+
+
+def encode_image(img, fmt):
+    """Re-encode an image; metadata such as EXIF is not copied over."""
+    out = BytesIO()
+    img.save(out, format=fmt, quality=85)
+    return out.getvalue()
+
+
+def process_profile_picture(data):
+    """Validate an upload and store every size as WebP and JPEG blobs."""
+    from PIL import Image, ImageOps
+
+    validate_image(data)
+
+    with Image.open(BytesIO(data)) as original:
+        # Apply the EXIF rotation before the metadata is dropped
+        img = ImageOps.exif_transpose(original).convert("RGB")
+
+    keys = {}
+    for name, size in PROFILE_SIZES.items():
+        thumb = img.copy()
+        thumb.thumbnail((size, size))
+        keys[name] = {
+            "webp": put_blob(encode_image(thumb, "WEBP")),
+            "jpeg": put_blob(encode_image(thumb, "JPEG")),
+        }
+    return keys
+
+
+def submit_profile_picture(data):
+    """Start processing an upload in the background and return its Future."""
+    return _executor.submit(process_profile_picture, data)
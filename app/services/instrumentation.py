@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Off unless APP_INSTRUMENTATION=1; admins can switch it on from Settings
+_enabled = os.environ.get("APP_INSTRUMENTATION") == "1"
+
+# Latency samples kept per (page, stage); older ones drop off
+MAX_SAMPLES = 2000
+
+_stats = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(value):
+    global _enabled
+    _enabled = bool(value)
+
+
+def set_page(name):
+    """Name the page the current script run belongs to.
+
+    Fragment reruns start on a fresh thread, so fragments call this too.
+    """
+    _local.page = name
+
+
+def current_page():
+    # Streamlit runs each script in its own thread; anything else is background work
+    return getattr(_local, "page", "background")
+
+
+def _entry(page, name):
+    key = (page, name)
+    entry = _stats.get(key)
+    if entry is None:
+        entry = {"samples": deque(maxlen=MAX_SAMPLES), "calls": 0,
+                 "rows": 0, "bytes": 0, "cache_hits": 0}
+        _stats[key] = entry
+    return entry
+
+
+def _store(name, seconds, rec):
+    with _lock:
+        entry = _entry(current_page(), name)
+        entry["samples"].append(seconds)
+        entry["calls"] += 1
+        entry["rows"] += rec.get("rows", 0)
+        entry["bytes"] += rec.get("bytes", 0)
+
+
+@contextmanager
+def stage(name, **counters):
+    """Time a block of code. Yields a dict where rows/bytes read can be added."""
+    if not _enabled:
+        # Callers may still write rec["rows"] = ..., it just goes nowhere
+        yield {}
+        return
+
+    rec = dict(counters)
+    start = time.perf_counter()
+    try:
+        yield rec
+    finally:
+        _store(name, time.perf_counter() - start, rec)
+
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _store(name, time.perf_counter() - start, {})
+        return wrapper
+    return decorator
+
+
+def record_cache_hit(name):
+    """Count a cache hit against a stage without timing anything."""
+    if not _enabled:
+        return
+    with _lock:
+        _entry(current_page(), name)["cache_hits"] += 1
+
+
+def _percentile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    index = min(int(q * len(sorted_samples)), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+def snapshot():
+    """Return one summary dict per (page, stage), latencies in milliseconds."""
+    with _lock:
+        items = [(key, dict(entry, samples=sorted(entry["samples"]))) for key, entry in _stats.items()]
+
+    rows = []
+    for (page, name), entry in sorted(items):
+        samples = entry["samples"]
+        rows.append({
+            "page": page,
+            "stage": name,
+            "calls": entry["calls"],
+            "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+            "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+            "rows": entry["rows"],
+            "bytes": entry["bytes"],
+            "cache_hits": entry["cache_hits"],
+        })
+    return rows
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def export_jsonl():
+    """One JSON object per (page, stage)."""
+    return "".join(json.dumps(row) + "\n" for row in snapshot())
+
+
+def export_prometheus():
+    """Prometheus text exposition format (latency as a summary, counters as counters)."""
+    rows = snapshot()
+    lines = ["# TYPE app_stage_latency_seconds summary"]
+    for row in rows:
+        labels = f'page="{row["page"]}",stage="{row["stage"]}"'
+        for q in ("50", "95", "99"):
+            lines.append(
+                f'app_stage_latency_seconds{{{labels},quantile="0.{q}"}} {row[f"p{q}_ms"] / 1000:.6f}'
+            )
+        lines.append(f"app_stage_latency_seconds_count{{{labels}}} {row['calls']}")
+
+    # Each metric family has to be listed in one block
+    for field in ("rows", "bytes", "cache_hits"):
+        lines.append(f"# TYPE app_stage_{field}_total counter")
+        for row in rows:
+            labels = f'page="{row["page"]}",stage="{row["stage"]}"'
+            lines.append(f"app_stage_{field}_total{{{labels}}} {row[field]}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,13 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4)
+def get_openai_client(api_key):
+    """Return one OpenAI client per API key for the whole process.
+
+    The openai package is only imported the first time a client is needed,
+    so pages that never chat don't pay for it.
+    """
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+
+from app.data.db import pooled_connection, write_connection
+from app.data.schema import COUNTED_TABLES, counter_seed_sql
+
+# Status values (lower-cased) that count as finished work
+CLOSED_STATUSES = ("closed", "resolved")
+HIGH_SEVERITIES = ("high", "critical")
+
+# How often the background job rebuilds the counters from the source tables
+RECONCILE_INTERVAL = 15 * 60
+
+# Entries in the row_changes log are kept this long; a cache that has not
+# refreshed for longer than this rebuilds from scratch
+ROW_CHANGES_MAX_AGE = 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+_reconciler_started = False
+_reconciler_lock = threading.Lock()
+
+
+def _load_counters():
+    """Read the whole summary table. It holds one row per source/status/severity."""
+    with pooled_connection() as conn:
+        counts = conn.execute("SELECT source, status, severity, n FROM status_counts").fetchall()
+        changes = conn.execute(
+            "SELECT source, status, severity, delta FROM status_count_changes WHERE day = date('now')"
+        ).fetchall()
+    return counts, changes
+
+
+def _total(rows, sources, keep):
+    """Add up the counter rows from the given sources that pass the keep test."""
+    return sum(row[3] for row in rows if row[0] in sources and keep(row[1], row[2]))
+
+
+def get_kpis():
+    """Return {card name: (value, change today)} for the Analytics metric cards."""
+    counts, changes = _load_counters()
+    incident_sources = ("incidents", "cyber_incidents")
+
+    rules = {
+        "Current Threats": (
+            incident_sources,
+            lambda status, severity: status == "open" and severity in HIGH_SEVERITIES,
+        ),
+        "Incidents Closed": (
+            incident_sources,
+            lambda status, severity: status in CLOSED_STATUSES,
+        ),
+        "Pending Tickets": (
+            ("tickets",),
+            lambda status, severity: status not in CLOSED_STATUSES,
+        ),
+        "Open Cyber Incidents": (
+            ("cyber_incidents",),
+            lambda status, severity: status == "open",
+        ),
+    }
+    return {
+        name: (_total(counts, sources, keep), _total(changes, sources, keep))
+        for name, (sources, keep) in rules.items()
+    }
+
+
+def reconcile_counters():
+    """Rebuild status_counts from the source tables in case anything drifted, and prune old change logs."""
+    with write_connection() as conn:
+        conn.execute("DELETE FROM status_counts")
+        for table, severity_column in COUNTED_TABLES.items():
+            conn.execute(counter_seed_sql(table, severity_column))
+        # Only today's changes are shown, keep a month for reference
+        conn.execute("DELETE FROM status_count_changes WHERE day < date('now', '-30 days')")
+        conn.execute("DELETE FROM row_changes WHERE changed_at < ?", (time.time() - ROW_CHANGES_MAX_AGE,))
+
+
+def _reconcile_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            reconcile_counters()
+        except Exception:
+            # Retried at the next interval; the counters stay as they were
+            logger.exception("Counter reconciliation failed")
+
+
+def start_reconciler(interval=RECONCILE_INTERVAL):
+    """Start the periodic reconciliation thread once per process."""
+    global _reconciler_started
+    with _reconciler_lock:
+        if not _reconciler_started:
+            threading.Thread(target=_reconcile_loop, args=(interval,), daemon=True).start()
+            _reconciler_started = True
+
+
+def get_table_totals():
+    """Return {table: row count} from the summary table instead of COUNT(*)."""
+    counts, _ = _load_counters()
+    totals = dict.fromkeys(COUNTED_TABLES, 0)
+    for source, _status, _severity, n in counts:
+        totals[source] += n
+    return totals
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+import zlib
+
+from app.data.documents import DOCUMENT_COLUMNS, get_documents, read_documents
+from app.services.embedding_service import get_embedder
+from app.services.vector_index import VectorIndex
+
+# How often the background thread looks for changed incidents and tickets
+REFRESH_INTERVAL = 2.0
+
+# A table whose refresh fails is retried after a delay that doubles each
+# time, up to this many seconds
+MAX_RETRY_DELAY = 5 * 60
+
+# Texts embedded per call while indexing
+EMBED_BATCH = 4096
+
+# Matches scoring below this share too little with the question to be useful
+MIN_SCORE = 0.1
+
+logger = logging.getLogger(__name__)
+
+_indexes = {}
+_progress = {}
+# {table: (failures in a row, monotonic time of the next attempt)}
+_failures = {}
+_embedder = None
+_ready = threading.Event()
+_started = False
+_start_lock = threading.Lock()
+
+
+def document_text(table, row):
+    """The text that is embedded for, and shown to the model from, one row."""
+    if table == "tickets":
+        text = (
+            f"Ticket {row['ticket_id']} [{row['priority']} priority, {row['status']}] "
+            f"{row['category']}: {row['subject']}"
+        )
+        if row["description"]:
+            text += f" — {row['description']}"
+        if row["assigned_to"]:
+            text += f" (assigned to {row['assigned_to']})"
+        return text
+
+    kind = "Cyber incident" if table == "cyber_incidents" else "Incident"
+    return f"{kind} #{row['id']} [{row['severity']} severity, {row['status']}] {row['date']}: {row['title']}"
+
+
+def embedding_text(table, row):
+    """Only the free text is embedded; ids, dates and statuses would match almost any query."""
+    if table == "tickets":
+        return " ".join(filter(None, (row["category"], row["subject"], row["description"])))
+    return row["title"] or ""
+
+
+def _embed(index, table, rows):
+    """Embed rows in batches and add them to the index."""
+    for start in range(0, len(rows), EMBED_BATCH):
+        batch = rows[start:start + EMBED_BATCH]
+        texts = [embedding_text(table, row) for row in batch]
+        index.add(
+            [row["id"] for row in batch],
+            _embedder.embed(texts),
+            tags=[zlib.crc32(text.encode("utf-8")) for text in texts],
+        )
+
+
+def _tag(table, row):
+    return zlib.crc32(embedding_text(table, row).encode("utf-8"))
+
+
+def _refresh(table):
+    """Bring one table's index up to date.
+
+    New rows are found by id and edited or deleted ones through the
+    row_changes log, so each pass reads only those. An edited row is only
+    re-embedded if its text checksum changed; a status change alone needs
+    no new embedding. If the log no longer reaches back to the last pass,
+    every row's checksum is compared with the index instead.
+    """
+    index = _indexes[table]
+    last_id, seq = _progress.get(table, (0, None))
+    new_last_id, new_seq, changed, rows = read_documents(table, last_id, seq)
+
+    if changed is None:
+        # Full pass: anything in the index without a matching row was deleted
+        ids, tags = index.entries()
+        indexed = dict(zip(ids.tolist(), tags.tolist()))
+        stale = [row for row in rows if indexed.get(row["id"]) != _tag(table, row)]
+        gone = indexed.keys() - {row["id"] for row in rows}
+    else:
+        indexed = index.tags(changed)
+        stale = [row for row in rows if row["id"] > last_id or indexed.get(row["id"]) != _tag(table, row)]
+        gone = changed - {row["id"] for row in rows}
+
+    # Edited rows are removed and embedded again
+    index.remove([*gone, *(row["id"] for row in stale if row["id"] in indexed)])
+    _embed(index, table, stale)
+    _progress[table] = (new_last_id, new_seq)
+
+
+def _refresh_due(interval):
+    """Refresh every table that is not waiting out a retry delay."""
+    for table in DOCUMENT_COLUMNS:
+        failures, retry_at = _failures.get(table, (0, 0.0))
+        if time.monotonic() < retry_at:
+            continue
+        try:
+            _refresh(table)
+        except Exception:
+            delay = min(interval * 2 ** failures, MAX_RETRY_DELAY)
+            _failures[table] = (failures + 1, time.monotonic() + delay)
+            logger.exception("Vector index refresh failed for %s, retrying in %.0f s", table, delay)
+            continue
+        if failures:
+            logger.info("Vector index refresh for %s recovered after %d failures", table, failures)
+            del _failures[table]
+
+
+def _refresh_loop(interval):
+    while True:
+        _refresh_due(interval)
+        _ready.set()
+        time.sleep(interval)
+
+
+def start_indexer(embedder=None, interval=REFRESH_INTERVAL):
+    """Build the indexes on a background thread and keep them current (once per process)."""
+    global _started, _embedder
+    with _start_lock:
+        if _started:
+            return
+        _embedder = embedder or get_embedder()
+        for table in DOCUMENT_COLUMNS:
+            _indexes[table] = VectorIndex(_embedder.dim)
+        threading.Thread(target=_refresh_loop, args=(interval,), daemon=True, name="vector-index").start()
+        _started = True
+
+
+def is_ready():
+    """Whether the first full pass over the tables has finished."""
+    return _ready.is_set()
+
+
+def retrieve(query, k=5):
+    """Return the k records most similar to the query as [(table, id, score)].
+
+    Returns nothing until the first indexing pass is done.
+    """
+    if not _ready.is_set() or not query.strip():
+        return []
+    vector = _embedder.embed([query])[0]
+    hits = [
+        (table, record_id, score)
+        for table, index in _indexes.items()
+        for record_id, score in index.search(vector, k)
+        if score >= MIN_SCORE
+    ]
+    hits.sort(key=lambda hit: hit[2], reverse=True)
+    return hits[:k]
+
+
+def build_context(query, k=5):
+    """Format the best matching records as a block for the system prompt."""
+    hits = retrieve(query, k)
+    rows = {
+        table: get_documents(table, [record_id for hit_table, record_id, _ in hits if hit_table == table])
+        for table in {hit[0] for hit in hits}
+    }
+    return "\n".join(
+        f"- {document_text(table, rows[table][record_id])}"
+        for table, record_id, _score in hits
+        if record_id in rows[table]
+    )
@@ -0,0 +1,245 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.data.tickets import RESOLUTION_COLUMNS, read_resolution_changes
+
+# The cube holds one row per combination of these
+DIMENSIONS = ("priority", "category", "assigned_to", "week")
+
+# Resolution time histogram: bucket 0 is under an hour, bucket i covers
+# [2^(i-1), 2^i) hours, and the last bucket also takes anything longer
+BUCKETS = 16
+BUCKET_COLUMNS = [f"h{i}" for i in range(BUCKETS)]
+
+_AGGREGATIONS = {"count": "sum", "sum": "sum", "min": "min", "max": "max", **{c: "sum" for c in BUCKET_COLUMNS}}
+
+# Per-process cube, plus how far into the tickets table and change log it has read
+_state = {"cube": None, "last_id": 0, "seq": None}
+_lock = threading.Lock()
+
+
+def _prepare(rows):
+    """Turn raw ticket rows into one row per ticket: its cell's dimensions, hours and bucket."""
+    frame = pd.DataFrame.from_records(rows, columns=("id", *RESOLUTION_COLUMNS), index="id")
+    created = pd.to_datetime(frame["created_date"], errors="coerce", format="ISO8601")
+    resolved = pd.to_datetime(frame["resolved_date"], errors="coerce", format="ISO8601")
+    hours = (resolved - created).dt.total_seconds() / 3600
+
+    # Skip dates that don't parse or end before they start
+    valid = hours.notna() & (hours >= 0)
+    frame = frame.loc[valid, ["priority", "category", "assigned_to"]].fillna("N/A")
+    hours = hours[valid].to_numpy()
+
+    # Weeks are labelled by their Monday
+    frame["week"] = created[valid].dt.to_period("W-SUN").dt.start_time.dt.strftime("%Y-%m-%d")
+    frame["hours"] = hours
+    frame["bucket"] = np.clip(
+        np.where(hours < 1, 0, np.floor(np.log2(np.maximum(hours, 1))) + 1), 0, BUCKETS - 1
+    ).astype("int64")
+    return frame
+
+
+class _Cube:
+    """Resolution-time measures per cell (one combination of DIMENSIONS).
+
+    Each ticket's cell, hours and bucket are kept too, so a changed or
+    deleted ticket's old contribution can be taken back out: counts, sums
+    and histograms are subtracted, and min/max are recomputed for just the
+    cells whose extreme was removed.
+    """
+
+    def __init__(self):
+        self.cells = {}
+        self.labels = [[] for _ in DIMENSIONS]
+        self.count = np.zeros(0)
+        self.sum = np.zeros(0)
+        self.min = np.zeros(0)
+        self.max = np.zeros(0)
+        self.histogram = np.zeros((0, BUCKETS))
+        self.tickets = pd.DataFrame({
+            "cell": pd.Series(dtype="int64"),
+            "hours": pd.Series(dtype="float64"),
+            "bucket": pd.Series(dtype="int64"),
+        })
+        self._frame = None
+
+    def _cell_codes(self, frame):
+        """Return each row's cell number, adding cells not seen before."""
+        # Combine per-column codes into one integer per row, then look up
+        # each distinct combination once
+        combined = np.zeros(len(frame), dtype="int64")
+        for dimension in DIMENSIONS:
+            codes, values = pd.factorize(frame[dimension])
+            combined = combined * len(values) + codes
+        _, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+        columns = [frame[dimension].iloc[first].tolist() for dimension in DIMENSIONS]
+
+        numbers = np.empty(len(first), dtype="int64")
+        for i, key in enumerate(zip(*columns)):
+            number = self.cells.get(key)
+            if number is None:
+                number = self.cells[key] = len(self.cells)
+                for labels, value in zip(self.labels, key):
+                    labels.append(value)
+            numbers[i] = number
+
+        extra = len(self.cells) - len(self.count)
+        if extra:
+            self.count = np.concatenate([self.count, np.zeros(extra)])
+            self.sum = np.concatenate([self.sum, np.zeros(extra)])
+            self.min = np.concatenate([self.min, np.full(extra, np.inf)])
+            self.max = np.concatenate([self.max, np.full(extra, -np.inf)])
+            self.histogram = np.concatenate([self.histogram, np.zeros((extra, BUCKETS))])
+        return numbers[inverse.reshape(-1)]
+
+    def _totals(self, cells, hours, buckets):
+        """Per-cell count, sum and histogram of some tickets, sized to the whole cube."""
+        n = len(self.count)
+        return (
+            np.bincount(cells, minlength=n),
+            np.bincount(cells, weights=hours, minlength=n),
+            np.bincount(cells * BUCKETS + buckets, minlength=n * BUCKETS).reshape(n, BUCKETS),
+        )
+
+    def add(self, frame):
+        if frame.empty:
+            return
+        cells = self._cell_codes(frame)
+        hours, buckets = frame["hours"].to_numpy(), frame["bucket"].to_numpy()
+        count, total, histogram = self._totals(cells, hours, buckets)
+        self.count += count
+        self.sum += total
+        self.histogram += histogram
+        np.minimum.at(self.min, cells, hours)
+        np.maximum.at(self.max, cells, hours)
+        added = pd.DataFrame({"cell": cells, "hours": hours, "bucket": buckets}, index=frame.index)
+        self.tickets = added if self.tickets.empty else pd.concat([self.tickets, added])
+        self._frame = None
+
+    def remove(self, ids):
+        hit = self.tickets.index.isin(list(ids))
+        old = self.tickets[hit]
+        if old.empty:
+            return
+        cells, hours = old["cell"].to_numpy(), old["hours"].to_numpy()
+        count, total, histogram = self._totals(cells, hours, old["bucket"].to_numpy())
+        self.count -= count
+        self.sum -= total
+        self.histogram -= histogram
+        self.tickets = self.tickets[~hit]
+
+        # Only cells that lost their smallest or largest value need a rescan
+        stale = np.unique(cells[(hours <= self.min[cells]) | (hours >= self.max[cells])])
+        empty = self.count[stale] <= 0
+        self.sum[stale[empty]] = 0.0
+        self.min[stale] = np.inf
+        self.max[stale] = -np.inf
+        rest = self.tickets[self.tickets["cell"].isin(stale[~empty])]
+        np.minimum.at(self.min, rest["cell"].to_numpy(), rest["hours"].to_numpy())
+        np.maximum.at(self.max, rest["cell"].to_numpy(), rest["hours"].to_numpy())
+        self._frame = None
+
+    def frame(self):
+        """The cube as a DataFrame indexed by DIMENSIONS, one row per non-empty cell."""
+        if self._frame is None:
+            live = np.flatnonzero(self.count > 0)
+            index = pd.MultiIndex.from_arrays(
+                [np.asarray(labels, dtype=object)[live] for labels in self.labels], names=DIMENSIONS
+            )
+            frame = pd.DataFrame({
+                "count": self.count[live],
+                "sum": self.sum[live],
+                "min": self.min[live],
+                "max": self.max[live],
+            }, index=index)
+            self._frame = frame.join(pd.DataFrame(self.histogram[live], columns=BUCKET_COLUMNS, index=index))
+        return self._frame
+
+
+def get_cube():
+    """Return the resolution-time cube, bringing it up to date first.
+
+    New tickets are found by row id and edited or deleted ones through the
+    row_changes log, so only those tickets are rolled in or taken out. The
+    cube is only built from every ticket the first time, or if this process
+    has fallen further behind than the log reaches.
+    """
+    with _lock:
+        cube = _state["cube"]
+        last_id, seq, changed, rows = read_resolution_changes(
+            _state["last_id"], _state["seq"] if cube is not None else None
+        )
+        if changed is None:
+            cube = _Cube()
+        elif changed:
+            cube.remove(changed)
+        if rows:
+            cube.add(_prepare(rows))
+        _state.update(cube=cube, last_id=last_id, seq=seq)
+        return cube.frame()
+
+
+def _quantiles(histogram, counts, lows, highs, q):
+    """Estimate the q-quantile of each row from its histogram.
+
+    Finds the bucket holding the q-th ticket and interpolates inside it on a
+    log scale, then keeps the result within the row's true min and max.
+    """
+    cumulative = histogram.cumsum(axis=1)
+    target = np.maximum(q * counts, 1e-9)[:, None]
+    bucket = (cumulative >= target).argmax(axis=1)
+    before = np.where(bucket > 0, cumulative[np.arange(len(bucket)), bucket - 1], 0)
+    inside = histogram[np.arange(len(bucket)), bucket]
+    fraction = np.divide(target[:, 0] - before, inside, out=np.zeros(len(bucket)), where=inside > 0)
+
+    upper = np.exp2(bucket.astype("float64"))
+    lower = np.where(bucket > 0, upper / 2, 0.0)
+    estimate = np.where(
+        bucket > 0,
+        lower * np.exp2(fraction),          # log-scale within [2^(i-1), 2^i)
+        fraction * upper,                   # linear within [0, 1)
+    )
+    return np.clip(estimate, lows, highs)
+
+
+def resolution_stats(by="priority", **filters):
+    """Return resolution time in hours per value of `by`.
+
+    filters pin other dimensions, e.g. priority="high". Work is in
+    proportion to the cube's size, not the number of tickets. Columns:
+    tickets, mean, p50, p90, min, max.
+    """
+    if by not in DIMENSIONS:
+        raise ValueError(f"Cannot break down by: {by}")
+
+    cube = get_cube()
+    for dimension, value in filters.items():
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Cannot filter on: {dimension}")
+        if value is not None:
+            cube = cube[cube.index.get_level_values(dimension) == value]
+
+    columns = ["tickets", "mean", "p50", "p90", "min", "max"]
+    if cube.empty:
+        return pd.DataFrame(columns=columns)
+
+    grouped = cube.groupby(level=by).agg(_AGGREGATIONS)
+    histogram = grouped[BUCKET_COLUMNS].to_numpy()
+    counts = grouped["count"].to_numpy()
+    lows, highs = grouped["min"].to_numpy(), grouped["max"].to_numpy()
+    return pd.DataFrame({
+        "tickets": counts.astype("int64"),
+        "mean": grouped["sum"].to_numpy() / counts,
+        "p50": _quantiles(histogram, counts, lows, highs, 0.5),
+        "p90": _quantiles(histogram, counts, lows, highs, 0.9),
+        "min": lows,
+        "max": highs,
+    }, index=grouped.index)
+
+
+def dimension_values(dimension):
+    """Return the distinct values of one dimension, for filter pickers."""
+    cube = get_cube()
+    return sorted(cube.index.get_level_values(dimension).unique())
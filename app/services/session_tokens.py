@@ -0,0 +1,235 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.data.db import DATA_DIR
+from app.data.sessions import list_revoked_token_ids, revoke_token_id
+
+# Tokens are valid for this many seconds after they are issued. The token
+# sits in the URL, so it also ends up in browser history, proxy logs and
+# any link that gets shared; keep it short-lived. Active users are given a
+# fresh token once half of this has passed (see restore_session).
+TOKEN_TTL = int(os.environ.get("APP_SESSION_TTL", 2 * 3600))
+
+# Name of the URL query parameter that carries the token between reloads
+QUERY_PARAM = "session"
+
+# Validated tokens kept in memory so repeat checks skip the HMAC and JSON work
+CACHE_SIZE = 1024
+
+# How often the revocation list is re-read, so a sign-out in one worker
+# reaches the others within this many seconds
+REVOCATION_REFRESH = 5.0
+
+SECRET_FILE = DATA_DIR / ".session_secret"
+
+# "<payload>.<signature>", both unpadded base64url. Anything else is
+# rejected before it reaches the HMAC or the JSON parser.
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,2048}\.[A-Za-z0-9_-]{43}")
+
+_cache = OrderedDict()
+_revoked = set()
+_revoked_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _secret():
+    """Return the signing key from APP_SESSION_SECRET or DATA/.session_secret.
+
+    The file is created on first use. Every worker and every restart reads
+    the same key, so tokens keep working across both.
+    """
+    env = os.environ.get("APP_SESSION_SECRET")
+    if env:
+        return env.encode("utf-8")
+
+    if not SECRET_FILE.exists():
+        SECRET_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = SECRET_FILE.with_name(f"{SECRET_FILE.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as file:
+            file.write(secrets.token_hex(32))
+        try:
+            # link() fails if another worker got there first; theirs wins
+            os.link(tmp, SECRET_FILE)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+    return SECRET_FILE.read_text().strip().encode("utf-8")
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload):
+    return _b64encode(hmac.new(_secret(), payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_token(username, role="user", ttl=None):
+    """Return a signed token for a user who has just passed the password check."""
+    claims = {
+        "u": username,
+        "r": role,
+        "exp": int(time.time() + (ttl or TOKEN_TTL)),
+        "jti": secrets.token_hex(8),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+
+def _decode(token):
+    """Check the signature and return the claims, or None for anything malformed."""
+    if not isinstance(token, str) or not TOKEN_PATTERN.fullmatch(token):
+        return None
+    payload, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        return None
+    if not (
+        isinstance(claims, dict)
+        and isinstance(claims.get("u"), str)
+        and isinstance(claims.get("r"), str)
+        and isinstance(claims.get("exp"), int)
+        and isinstance(claims.get("jti"), str)
+    ):
+        return None
+    return claims
+
+
+def _is_revoked(token_id):
+    global _revoked, _revoked_loaded_at
+    now = time.monotonic()
+    if now - _revoked_loaded_at > REVOCATION_REFRESH:
+        _revoked = list_revoked_token_ids()
+        _revoked_loaded_at = now
+    return token_id in _revoked
+
+
+def verify_token(token):
+    """Return {"username", "role"} for a valid token, or None.
+
+    Tokens that are forged, expired or revoked are rejected. A token seen
+    before is answered from the cache without re-checking the signature.
+    """
+    if not token:
+        return None
+
+    with _lock:
+        claims = _cache.get(token)
+        if claims is not None:
+            _cache.move_to_end(token)
+
+    if claims is None:
+        claims = _decode(token)
+        if claims is None:
+            return None
+
+    if claims["exp"] < time.time() or _is_revoked(claims["jti"]):
+        with _lock:
+            _cache.pop(token, None)
+        return None
+
+    with _lock:
+        _cache[token] = claims
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return {"username": claims["u"], "role": claims["r"], "expires_at": claims["exp"]}
+
+
+def revoke_token(token):
+    """Invalidate a token everywhere, e.g. on sign-out."""
+    claims = _decode(token) if token else None
+    if claims is None:
+        return
+    revoke_token_id(claims["jti"], claims["exp"])
+    with _lock:
+        _revoked.add(claims["jti"])
+        _cache.pop(token, None)
+
+
+def restore_session(state, query_params):
+    """Sign the user back in from the token in the URL, if there is one.
+
+    Called at the top of each page with st.session_state and
+    st.query_params. Keeps the token in the URL while signed in, so a
+    reload, a server restart or a different worker needs no password.
+    Once half its lifetime has passed the token is swapped for a new one,
+    so a copy left in history or logs soon stops working.
+    state["account"] is the signed-in user name. Unlike state["username"]
+    (a display name the user can edit) nothing else writes it, so it is
+    what records of who did what should use.
+    Returns whether the user is signed in.
+    """
+    token = state.get("session_token")
+    if state.get("logged_in"):
+        if token and state.get("session_expires_at", 0) - time.time() < TOKEN_TTL / 2:
+            user = verify_token(token)
+            if user is not None:
+                revoke_token(token)
+                _set_session(state, query_params, user["username"], user["role"])
+                return True
+        if token and query_params.get(QUERY_PARAM) != token:
+            query_params[QUERY_PARAM] = token
+        return True
+
+    token = query_params.get(QUERY_PARAM)
+    user = verify_token(token)
+    if user is None:
+        if token:
+            del query_params[QUERY_PARAM]
+        return False
+
+    state["logged_in"] = True
+    state["account"] = user["username"]
+    state["username"] = user["username"]
+    state["role"] = user["role"]
+    state["session_token"] = token
+    state["session_expires_at"] = user["expires_at"]
+    return True
+
+
+def _set_session(state, query_params, username, role):
+    token = issue_token(username, role)
+    state["session_token"] = token
+    state["session_expires_at"] = time.time() + TOKEN_TTL
+    query_params[QUERY_PARAM] = token
+
+
+def start_session(state, query_params, user):
+    """Record a successful password sign-in and hand out its token."""
+    state["logged_in"] = True
+    state["account"] = user["username"]
+    state["username"] = user["username"]
+    state["role"] = user["role"]
+    _set_session(state, query_params, user["username"], user["role"])
+
+
+def end_session(state, query_params):
+    """Sign out: revoke the token and drop it from the URL and the session."""
+    revoke_token(state.get("session_token"))
+    if QUERY_PARAM in query_params:
+        del query_params[QUERY_PARAM]
+    state["logged_in"] = False
+    state["account"] = None
+    state["username"] = ""
+    state["role"] = "user"
+    state["session_token"] = None
+    state["session_expires_at"] = 0
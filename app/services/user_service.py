@@ -0,0 +1,58 @@
+import json
+import os
+
+import bcrypt
+
+from app.data.users import get_user, insert_user, insert_users, user_exists
+from app.services.instrumentation import timed
+
+
+@timed("bcrypt_hash")
+def hash_password(plain_text_password):
+    """Hash a password with a fresh bcrypt salt and return it as text."""
+    hashed = bcrypt.hashpw(plain_text_password.encode("utf-8"), bcrypt.gensalt())
+    return hashed.decode("utf-8")
+
+
+@timed("bcrypt_verify")
+def verify_password(plain_text_password, hashed_password):
+    """Check a password against a stored bcrypt hash."""
+    return bcrypt.checkpw(plain_text_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def create_account(username, password, role="user"):
+    """Register a new user. Returns False if the username is taken."""
+    if user_exists(username):
+        return False
+    insert_user(username, hash_password(password), role)
+    return True
+
+
+def authenticate(username, password):
+    """Return the user's details if the password is correct, otherwise None."""
+    user = get_user(username)
+    if user is None or not verify_password(password, user["password_hash"]):
+        return None
+    return {"id": user["id"], "username": user["username"], "role": user["role"]}
+
+
+def import_legacy_users(json_path="users.json", txt_path="users.txt"):
+    """Copy accounts from the old users.json / users.txt files into the database."""
+    rows = []
+
+    # users.json (home.py) stored plain-text passwords, so hash them now
+    if os.path.exists(json_path):
+        with open(json_path, "r") as file:
+            for username, password in json.load(file).items():
+                if not user_exists(username):
+                    rows.append((username, hash_password(password), "user"))
+
+    # users.txt (week7.py) already holds "username,bcrypt_hash" lines
+    if os.path.exists(txt_path):
+        with open(txt_path, "r") as file:
+            for line in file:
+                if "," in line:
+                    username, stored_hash = line.strip().split(",", 1)
+                    rows.append((username, stored_hash, "user"))
+
+    return insert_users(rows) if rows else 0
@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+
+# Below this many vectors every query scores them all; above it an
+# inverted-file (IVF) index is trained and only the nearest clusters are searched
+BRUTE_FORCE_LIMIT = 50_000
+
+# Clusters searched per query once the IVF index is in use
+N_PROBE = 12
+
+# Removed vectors are only flagged; the arrays are compacted past this share
+COMPACT_RATIO = 0.25
+
+
+class VectorIndex:
+    """Cosine-similarity search over L2-normalised vectors keyed by integer id.
+
+    Each vector also carries a tag (here a checksum of the text it was made
+    from) so callers can tell which ids need re-embedding. Safe to search
+    from several threads while another thread adds or removes vectors.
+    """
+
+    def __init__(self, dim):
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._size = 0
+        self._ids = np.empty(0, dtype="int64")
+        self._tags = np.empty(0, dtype="uint32")
+        self._alive = np.empty(0, dtype=bool)
+        self._vectors = np.empty((0, dim), dtype="float32")
+        self._dead = 0
+        # IVF state: cluster centres and the row numbers in each cluster
+        self._centroids = None
+        self._members = None
+        self._trained_on = 0
+
+    def __len__(self):
+        return self._size - self._dead
+
+    def entries(self):
+        """Return (ids, tags) of every live vector."""
+        with self._lock:
+            alive = self._alive[:self._size]
+            return self._ids[:self._size][alive].copy(), self._tags[:self._size][alive].copy()
+
+    def tags(self, ids):
+        """Return {id: tag} for those of the given ids that are in the index."""
+        with self._lock:
+            rows = np.flatnonzero(
+                np.isin(self._ids[:self._size], np.asarray(list(ids), dtype="int64")) & self._alive[:self._size]
+            )
+            return dict(zip(self._ids[rows].tolist(), self._tags[rows].tolist()))
+
+    # ---------------- changes ----------------
+    def _reserve(self, extra):
+        """Grow the arrays geometrically so repeated small adds stay cheap."""
+        needed = self._size + extra
+        if needed <= len(self._ids):
+            return
+        capacity = max(needed, 2 * len(self._ids), 1024)
+        for name, fill in (("_ids", 0), ("_tags", 0), ("_alive", False)):
+            old = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+        vectors = np.zeros((capacity, self.dim), dtype="float32")
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+
+    def add(self, ids, vectors, tags=None):
+        """Add vectors under the given ids (call remove() first to replace one)."""
+        ids = np.asarray(ids, dtype="int64")
+        if not len(ids):
+            return
+        with self._lock:
+            self._reserve(len(ids))
+            start, end = self._size, self._size + len(ids)
+            self._ids[start:end] = ids
+            self._tags[start:end] = 0 if tags is None else tags
+            self._alive[start:end] = True
+            self._vectors[start:end] = vectors
+            self._size = end
+
+            if self._centroids is not None:
+                self._assign(np.arange(start, end))
+            self._maybe_train()
+
+    def remove(self, ids):
+        """Drop the vectors stored under these ids."""
+        ids = np.asarray(list(ids), dtype="int64")
+        if not len(ids):
+            return
+        with self._lock:
+            hit = np.isin(self._ids[:self._size], ids) & self._alive[:self._size]
+            self._alive[:self._size][hit] = False
+            self._dead += int(hit.sum())
+            if self._dead > COMPACT_RATIO * max(self._size, 1):
+                self._compact()
+
+    def _compact(self):
+        alive = np.flatnonzero(self._alive[:self._size])
+        self._ids = self._ids[alive]
+        self._tags = self._tags[alive]
+        self._vectors = self._vectors[alive]
+        self._alive = np.ones(len(alive), dtype=bool)
+        self._size = len(alive)
+        self._dead = 0
+        self._centroids = self._members = None
+        self._trained_on = 0
+        self._maybe_train()
+
+    # ---------------- IVF ----------------
+    def _maybe_train(self):
+        """Train the clusters once the index outgrows brute force, and again each time it doubles."""
+        if len(self) < BRUTE_FORCE_LIMIT or self._size < 2 * self._trained_on:
+            return
+        rows = np.flatnonzero(self._alive[:self._size])
+        n_lists = int(np.sqrt(len(rows)))
+        rng = np.random.default_rng(0)
+        sample = self._vectors[rng.choice(rows, size=min(len(rows), 32 * n_lists), replace=False)]
+
+        # Spherical k-means: centres are renormalised so dot product is cosine
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(8):
+            nearest = (sample @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        self._centroids = centroids
+        self._members = [np.empty(0, dtype="int64") for _ in range(n_lists)]
+        self._trained_on = self._size
+        self._assign(np.arange(self._size))
+
+    def _assign(self, rows):
+        """Put rows into their nearest cluster, in chunks to bound memory."""
+        for start in range(0, len(rows), 65536):
+            chunk = rows[start:start + 65536]
+            nearest = (self._vectors[chunk] @ self._centroids.T).argmax(axis=1)
+            order = np.argsort(nearest, kind="stable")
+            lists, starts = np.unique(nearest[order], return_index=True)
+            for cluster, members in zip(lists, np.split(chunk[order], starts[1:])):
+                self._members[cluster] = np.concatenate([self._members[cluster], members])
+
+    # ---------------- queries ----------------
+    def search(self, query, k=5):
+        """Return [(id, score)] for the k most similar vectors, best first."""
+        query = np.asarray(query, dtype="float32").reshape(-1)
+        with self._lock:
+            if self._centroids is None:
+                rows = np.arange(self._size)
+            else:
+                probe = np.argpartition(-(self._centroids @ query), min(N_PROBE, len(self._centroids) - 1))
+                rows = np.concatenate([self._members[c] for c in probe[:N_PROBE]])
+            rows = rows[self._alive[rows]]
+            if not len(rows):
+                return []
+            scores = self._vectors[rows] @ query
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(self._ids[rows[i]]), float(scores[i])) for i in top]
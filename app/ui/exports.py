@@ -0,0 +1,52 @@
+import streamlit as st
+
+from app.services.export_service import FORMATS, job_progress, start_export
+
+# Export widgets shared by the pages. Files are written on a worker thread
+# in batches (app/services/export_service.py), so memory stays flat however
+# many rows are exported. Serving the finished file is the one step that is
+# not: Streamlit keeps every download in its in-memory media store, whatever
+# form `data` takes, for as long as the button is on the page.
+
+
+@st.fragment(run_every=1)
+def export_progress(key):
+    """Show progress until the export finishes, then redraw the page."""
+    job = st.session_state.exports[key]
+    if not job["future"].done():
+        st.progress(job_progress(job) or 0.0, text=f"Exporting… {job['rows']:,} rows written")
+        return
+    st.rerun()
+
+
+def export_controls(key, name, make_batches, total=None):
+    """Format picker and "Prepare download" button, then progress and the download link.
+
+    make_batches() is only called when an export is started.
+    """
+    jobs = st.session_state.setdefault("exports", {})
+    col_fmt, col_btn = st.columns(2)
+    fmt = col_fmt.selectbox("Export format", list(FORMATS), key=f"export_fmt_{key}")
+    if col_btn.button("Prepare download", key=f"export_btn_{key}"):
+        jobs[key] = start_export(make_batches(), name, fmt, total=total)
+
+    job = jobs.get(key)
+    if job is None:
+        return
+    if not job["future"].done():
+        export_progress(key)
+        return
+    try:
+        path = job["future"].result()
+    except Exception as e:
+        st.error(f"Export failed: {e}")
+        return
+    if path.exists():
+        # The file is only read when the button is clicked, not on every rerun
+        st.download_button(
+            f"⬇️ Download {path.name} ({job['rows']:,} rows)",
+            data=path.read_bytes,
+            file_name=path.name,
+            mime=FORMATS[job["format"]],
+            key=f"export_dl_{key}",
+        )
@@ -0,0 +1,159 @@
+"""Deterministic synthetic data for the benchmarks.
+
+The same seed and size always produce the same files, so timings from
+different runs (or machines) are measured against identical data.
+
+    python -m benchmarks.generate_data --sizes 1000 100000
+"""
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+import bcrypt
+
+from app.data.db import DATA_DIR, connect_database
+from app.data.schema import create_all_tables
+from app.data.tickets import TICKET_COLUMNS
+
+DEFAULT_DIR = DATA_DIR / "benchmarks"
+SIZES = (1_000, 100_000, 1_000_000, 10_000_000)
+
+PRIORITIES = ("Low", "Medium", "High", "Critical")
+STATUSES = ("Open", "In Progress", "Resolved", "Closed")
+CATEGORIES = ("Hardware", "Software", "Network", "Access", "Email")
+SEVERITIES = ("low", "medium", "high")
+INCIDENT_STATUSES = ("open", "resolved", "closed")
+WORDS = ("login", "printer", "vpn", "phishing", "malware", "outage", "password",
+         "laptop", "firewall", "backup", "email", "database", "slow", "error")
+
+# Every benchmark user gets this password. It is hashed once per run at the
+# same bcrypt cost as real accounts, so login timings include the real
+# hashing cost; only the salt differs between runs.
+BENCH_PASSWORD = "benchmark-password"
+BENCH_HASH = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+BATCH_SIZE = 50_000
+
+
+def ticket_rows(n, seed=0):
+    """Yield n ticket dicts in the it_tickets.csv layout."""
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    for i in range(1, n + 1):
+        created = start + timedelta(days=rng.randrange(730))
+        status = rng.choice(STATUSES)
+        resolved = None
+        if status in ("Resolved", "Closed"):
+            resolved = (created + timedelta(days=rng.randrange(30))).isoformat()
+        yield {
+            "ticket_id": f"TCK{i:08d}",
+            "priority": rng.choice(PRIORITIES),
+            "status": status,
+            "category": rng.choice(CATEGORIES),
+            "subject": " ".join(rng.choice(WORDS) for _ in range(3)),
+            "description": " ".join(rng.choice(WORDS) for _ in range(12)),
+            "created_date": created.isoformat(),
+            "resolved_date": resolved,
+            "assigned_to": f"analyst{rng.randrange(50):02d}",
+        }
+
+
+def incident_rows(n, seed=0):
+    """Yield n (title, severity, status) tuples."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield (" ".join(rng.choice(WORDS) for _ in range(4)),
+               rng.choice(SEVERITIES), rng.choice(INCIDENT_STATUSES))
+
+
+def write_tickets_csv(path, n, seed=0):
+    """Write it_tickets.csv with n rows."""
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=TICKET_COLUMNS)
+        writer.writeheader()
+        writer.writerows(ticket_rows(n, seed))
+
+
+def write_users_txt(path, n):
+    """Write a week7-style users.txt with n "username,hash" lines."""
+    with open(path, "w") as file:
+        for i in range(n):
+            file.write(f"user{i:08d},{BENCH_HASH}\n")
+
+
+def _batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_database(db_path, n, seed=0):
+    """Create a database with n tickets, n incidents, n cyber incidents and n users."""
+    db_path = Path(db_path)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    conn = connect_database(db_path)
+    try:
+        create_all_tables(conn)
+        # Bulk loading; the benchmarks themselves run with the normal settings
+        conn.execute("PRAGMA synchronous=OFF")
+
+        placeholders = ", ".join("?" for _ in TICKET_COLUMNS)
+        for batch in _batches(ticket_rows(n, seed)):
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO tickets ({', '.join(TICKET_COLUMNS)}) VALUES ({placeholders})",
+                    [tuple(row[col] for col in TICKET_COLUMNS) for row in batch]
+                )
+        for table, table_seed in (("incidents", seed + 1), ("cyber_incidents", seed + 2)):
+            for batch in _batches(incident_rows(n, table_seed)):
+                with conn:
+                    conn.executemany(
+                        f"INSERT INTO {table} (title, severity, status) VALUES (?, ?, ?)", batch
+                    )
+        for batch in _batches((f"user{i:08d}", BENCH_HASH, "user") for i in range(n)):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", batch
+                )
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def dataset_dir(base_dir, n):
+    return Path(base_dir) / f"n{n}"
+
+
+def generate(base_dir, n, seed=0):
+    """Create every file for one size and return the folder they are in."""
+    folder = dataset_dir(base_dir, n)
+    folder.mkdir(parents=True, exist_ok=True)
+    write_tickets_csv(folder / "it_tickets.csv", n, seed)
+    write_users_txt(folder / "users.txt", n)
+    build_database(folder / "benchmark.db", n, seed)
+    return folder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate benchmark datasets.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES[:2]))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=DEFAULT_DIR)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        print(f"Generating {n:,} rows...")
+        print("  ->", generate(args.out, n, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Headless load test: many virtual users driving the pages through AppTest.
+
+    python -m benchmarks.load_test --users 1 2 4 8 16 --duration 20
+
+Each virtual user repeats a realistic flow against one page (sign in on
+home.py, browse and filter CSVs on dashboard.py, add a ticket on CRUD.py,
+view Analytics.py, chat on chatbot.py with a mocked LLM). For every page
+the number of concurrent users is stepped up and throughput, tail latency
+and session memory are reported. The saturation point is the first step
+where adding users stops adding throughput or p95 latency passes the SLO.
+
+AppTest runs the scripts in this process exactly like a single Streamlit
+server would, so the numbers describe one server process.
+"""
+import argparse
+import json
+import pickle
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import openai
+from streamlit.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test as app_test_module
+
+import app.data.db as db
+from app.services.user_service import create_account
+
+ROOT = Path(__file__).resolve().parents[1]
+LOAD_USER = "loadtest"
+LOAD_PASSWORD = "loadtest-password"
+
+
+class FakeOpenAI:
+    """Stands in for openai.OpenAI so chat flows never leave the machine."""
+
+    latency = 0.2
+
+    def __init__(self, *args, **kwargs):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, temperature=1.0):
+        time.sleep(self.latency)
+        reply = f"Mock answer to: {messages[-1]['content'][:40]}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+
+def new_app(page, logged_in=True):
+    at = AppTest.from_file(str(ROOT / page), default_timeout=60)
+    at.secrets["OPENAI_API_KEY"] = "load-test"
+    if logged_in:
+        at.session_state["logged_in"] = True
+        at.session_state["account"] = LOAD_USER
+        at.session_state["username"] = LOAD_USER
+        at.session_state["role"] = "user"
+    return at
+
+
+# -----------------------------------------------------------
+# FLOWS — each returns the AppTest so its session can be measured
+# -----------------------------------------------------------
+def flow_login():
+    at = new_app("home.py", logged_in=False)
+    at.run()
+    inputs = {w.label: w for w in at.text_input}
+    inputs["Username"].set_value(LOAD_USER)
+    inputs["Password"].set_value(LOAD_PASSWORD)
+    next(b for b in at.button if b.label == "Sign In").click().run()
+    return at
+
+
+def flow_dashboard():
+    at = new_app("dashboard.py")
+    at.run()
+    # Filter the first CSV on its first column, like an analyst searching
+    search = [w for w in at.text_input if w.label == "Filter value"]
+    if search:
+        search[0].set_value("high").run()
+    return at
+
+
+def flow_crud():
+    at = new_app("CRUD.py")
+    at.run()
+    at.text_input(key="tic1").set_value("Load test ticket")
+    next(b for b in at.button if b.label == "Add Ticket").click().run()
+    return at
+
+
+def flow_analytics():
+    at = new_app("Analytics.py")
+    at.run()
+    return at
+
+
+def flow_chat():
+    at = new_app("chatbot.py")
+    at.run()
+    at.chat_input[0].set_value("Summarise today's open incidents").run()
+    return at
+
+
+FLOWS = {
+    "home.py": flow_login,
+    "dashboard.py": flow_dashboard,
+    "CRUD.py": flow_crud,
+    "Analytics.py": flow_analytics,
+    "chatbot.py": flow_chat,
+}
+
+
+def session_bytes(at):
+    """Approximate memory held by a session: its pickled session state."""
+    total = 0
+    for key in at.session_state:
+        try:
+            total += len(pickle.dumps(at.session_state[key]))
+        except Exception:
+            pass
+    return total
+
+
+def run_step(flow, users, duration):
+    """Run `users` virtual users for `duration` seconds and summarise."""
+    latencies = []
+    sizes = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def virtual_user():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                at = flow()
+                failed = at.exception[0].message if at.exception else None
+                size = session_bytes(at)
+            except Exception as e:
+                failed, size = repr(e), 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                if failed:
+                    errors.append(failed)
+                else:
+                    latencies.append(elapsed)
+                    sizes.append(size)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    threads = [threading.Thread(target=virtual_user) for _ in range(users)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latencies.sort()
+
+    def pct(q):
+        return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1) if latencies else None
+
+    return {
+        "users": users,
+        "flows": len(latencies),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:3],
+        "throughput_per_s": round(len(latencies) / wall, 2),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "session_state_kb": round(statistics.mean(sizes) / 1024, 1) if sizes else 0,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+    }
+
+
+def find_saturation(steps, slo_ms, min_gain):
+    """Return the user count where the page stopped scaling, or None."""
+    best = 0.0
+    for step in steps:
+        if step["p95_ms"] is not None and step["p95_ms"] > slo_ms:
+            return step["users"]
+        if best and step["throughput_per_s"] < best * (1 + min_gain):
+            return step["users"]
+        best = max(best, step["throughput_per_s"])
+    return None
+
+
+def share_runtime():
+    """Give every concurrent AppTest the same mock runtime.
+
+    AppTest installs its own mock as the global Runtime for each run and
+    clears it afterwards, which breaks when runs overlap. A single shared
+    runtime, like a real server has, lets virtual users run in parallel.
+    """
+    runtime = app_test_module.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test_module.MediaFileManager(
+        app_test_module.MemoryMediaFileStorage("/mock/media")
+    )
+    runtime.dataframe_source_mgr = app_test_module.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test_module.MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    # CPython 3.11 can fail when several threads compile() at once
+    compile_lock = threading.Lock()
+    get_bytecode = app_test_module.ScriptCache.get_bytecode
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    app_test_module.ScriptCache.get_bytecode = locked_get_bytecode
+
+
+def setup(workdir, llm_latency):
+    """Point the app at a throwaway database with a known account."""
+    db.DB_PATH = Path(workdir) / "loadtest.db"
+    create_account(LOAD_USER, LOAD_PASSWORD)
+
+    FakeOpenAI.latency = llm_latency
+    openai.OpenAI = FakeOpenAI
+    share_runtime()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent virtual-user load test.")
+    parser.add_argument("--pages", nargs="+", default=list(FLOWS), choices=list(FLOWS))
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=15, help="seconds per step")
+    parser.add_argument("--slo-ms", type=float, default=2000, help="p95 latency limit")
+    parser.add_argument("--min-gain", type=float, default=0.10,
+                        help="throughput growth below this counts as saturated")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--output", type=Path, default=Path(__file__).resolve().parent / "load_results.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup(workdir, args.llm_latency)
+        report = {}
+        for page in args.pages:
+            print(f"\n{page}")
+            print(f"{'users':>6} {'flows/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'state KB':>9} {'errors':>7}")
+            steps = []
+            for users in args.users:
+                step = run_step(FLOWS[page], users, args.duration)
+                steps.append(step)
+                print(f"{users:>6} {step['throughput_per_s']:>8} {step['p50_ms']!s:>8} "
+                      f"{step['p95_ms']!s:>8} {step['p99_ms']!s:>8} "
+                      f"{step['session_state_kb']:>9} {step['errors']:>7}")
+            saturation = find_saturation(steps, args.slo_ms, args.min_gain)
+            print(f"Saturation point: {saturation or 'not reached'}")
+            report[page] = {"steps": steps, "saturation_users": saturation}
+
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
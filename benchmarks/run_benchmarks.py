@@ -0,0 +1,173 @@
+"""Time the data paths behind each page and compare with a stored baseline.
+
+    python -m benchmarks.run_benchmarks --sizes 1000 100000
+    python -m benchmarks.run_benchmarks --save-baseline
+
+Datasets are generated on first use (see generate_data.py). Results are
+written as JSON; when a baseline exists every benchmark is compared with
+it and the script exits with status 1 if anything got slower than the
+allowed ratio.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+import app.data.db as db
+from app.data.incidents import insert_incident, list_incidents
+from app.data.tickets import count_tickets_by, count_tickets_by_month, insert_ticket, list_tickets
+from app.services.metrics_service import get_kpis
+from benchmarks.generate_data import BENCH_PASSWORD, DEFAULT_DIR, dataset_dir, generate
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_RESULTS = BENCH_DIR / "results.json"
+
+
+def measure(func, repeat):
+    """Call func repeat times and return latency statistics in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(int(0.95 * repeat), repeat - 1)], 4),
+    }
+
+
+def quiet(func):
+    """week7.login_user prints on every call; keep the output readable."""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapper
+
+
+def analytics_groupbys(csv_path):
+    """The pandas version of the Analytics ticket charts, run over the CSV."""
+    tickets = pd.read_csv(csv_path, usecols=["priority", "created_date"])
+    tickets["priority"].fillna("N/A").value_counts()
+    created = pd.to_datetime(tickets["created_date"], errors="coerce").dropna()
+    created.dt.to_period("M").astype(str).value_counts()
+
+
+def run_size(folder, n, repeat):
+    """Run every benchmark against one generated dataset."""
+    # The data helpers read DB_PATH on each call, so point them at this dataset
+    db.DB_PATH = folder / "benchmark.db"
+
+    # Imported late: week7 is a lab script, importing it only defines functions
+    from week7 import login_user
+
+    # Unique per run, so --reuse never collides with tickets from earlier runs
+    run_id = time.time_ns()
+    counter = iter(range(10**9))
+    user = f"user{n // 2:08d}"
+
+    # add_ticket / insert_record / fetch_tickets / fetch_latest in CRUD.py are
+    # thin wrappers over these app.data calls
+    benches = {
+        "add_ticket": lambda: insert_ticket(
+            f"BENCH{run_id}-{next(counter)}", "High", "Open", "Software", "bench", "bench",
+            "2024-01-01", None, "bench"
+        ),
+        "fetch_tickets": lambda: list_tickets(limit=10),
+        "fetch_tickets_filtered": lambda: list_tickets(limit=10, status="Open", priority="High"),
+        "insert_record": lambda: insert_incident("cyber_incidents", "bench", "high", "open"),
+        "fetch_latest": lambda: list_incidents("cyber_incidents", 10),
+        "login_user": quiet(lambda: login_user(user, BENCH_PASSWORD)),
+        "kpis": get_kpis,
+        "tickets_by_priority_sql": lambda: count_tickets_by("priority"),
+        "tickets_by_month_sql": count_tickets_by_month,
+    }
+    results = {name: measure(func, repeat) for name, func in benches.items()}
+
+    # Parsing the whole CSV is far slower than the rest, so run it fewer times
+    results["analytics_groupbys_csv"] = measure(
+        lambda: analytics_groupbys(folder / "it_tickets.csv"), max(1, repeat // 10)
+    )
+    return results
+
+
+def compare(results, baseline, max_ratio):
+    """Return a list of (size, name, ratio) for benchmarks slower than allowed."""
+    regressions = []
+    for size, benches in results.items():
+        for name, stats in benches.items():
+            old = baseline.get(size, {}).get(name)
+            if not old or not old["median_ms"]:
+                continue
+            ratio = stats["median_ms"] / old["median_ms"]
+            stats["baseline_median_ms"] = old["median_ms"]
+            stats["ratio"] = round(ratio, 3)
+            if ratio > max_ratio:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data-path benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DIR)
+    parser.add_argument("--reuse", action="store_true",
+                        help="use existing datasets instead of regenerating them")
+    parser.add_argument("--output", type=Path, default=DEFAULT_RESULTS)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--max-ratio", type=float, default=1.25,
+                        help="slowest allowed median compared with the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    for n in args.sizes:
+        folder = dataset_dir(args.data_dir, n)
+        # The write benchmarks add rows, so start from freshly generated data
+        # unless asked to reuse what is already there
+        if not (args.reuse and (folder / "benchmark.db").exists()):
+            print(f"Generating {n:,} rows...")
+            generate(args.data_dir, n)
+        print(f"Running benchmarks for {n:,} rows...")
+        results[str(n)] = run_size(folder, n, args.repeat)
+
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.max_ratio)
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+
+    for size, name, ratio in regressions:
+        print(f"REGRESSION: {name} at {int(size):,} rows is {ratio:.2f}x the baseline")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
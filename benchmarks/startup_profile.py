@@ -0,0 +1,134 @@
+"""Cold-start profile for every page, with a time budget per page.
+
+    python -m benchmarks.startup_profile
+    python -m benchmarks.startup_profile --pages chatbot.py --top 15
+
+Each page is rendered once in a fresh interpreter started with
+`-X importtime`. Streamlit itself is imported first (a running server has
+already paid for that), then the page's first run is timed. The report
+lists the page's time-to-first-render and the slowest modules it
+imported. The script exits with status 1 if any page is over budget, so
+it can gate CI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Milliseconds from "streamlit already loaded" to the page's first render
+BUDGETS_MS = {
+    "home.py": 1500,
+    "Settings.py": 1000,
+    "chatbot.py": 2000,
+    "CRUD.py": 1500,
+    "dashboard.py": 2500,
+    "Analytics.py": 2500,
+}
+
+MARKER = "startup-profile: page run starts"
+
+# Runs inside the child interpreter
+CHILD = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+import app.data.db as db
+db.DB_PATH = {db_path!r}
+
+at = AppTest.from_file({page!r}, default_timeout=120)
+at.secrets["OPENAI_API_KEY"] = "startup-profile"
+at.session_state["logged_in"] = True
+at.session_state["account"] = "profiler"
+at.session_state["username"] = "profiler"
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"first_render_ms": elapsed, "errors": [e.message for e in at.exception]}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Return [(cumulative_us, module)] for top-level imports made by the page."""
+    imports = []
+    after_marker = False
+    for line in stderr.splitlines():
+        if line.strip() == MARKER:
+            after_marker = True
+            continue
+        if not after_marker or not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        # Nested imports are indented; keep only what the page pulled in directly
+        if not name.startswith("  "):
+            imports.append((int(parts[1]), name.strip()))
+    return sorted(imports, reverse=True)
+
+
+def profile_page(page, db_path):
+    code = CHILD.format(page=str(ROOT / page), db_path=str(db_path), marker=MARKER)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, timeout=300
+    )
+    if proc.returncode != 0 or not proc.stdout.strip():
+        return {"error": proc.stderr.strip().splitlines()[-1:] or ["no output"]}
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = [
+        {"module": name, "cumulative_ms": round(us / 1000, 1)}
+        for us, name in parse_importtime(proc.stderr)
+    ]
+    result["import_ms"] = round(sum(i["cumulative_ms"] for i in result["imports"]), 1)
+    result["first_render_ms"] = round(result["first_render_ms"], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cold start per page.")
+    parser.add_argument("--pages", nargs="+", default=list(BUDGETS_MS), choices=list(BUDGETS_MS))
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to list per page")
+    parser.add_argument("--budget-scale", type=float,
+                        default=float(os.environ.get("APP_STARTUP_BUDGET_SCALE", "1")),
+                        help="multiply every budget, e.g. 2 on slow CI machines "
+                             "(default: APP_STARTUP_BUDGET_SCALE or 1)")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    report = {}
+    over_budget = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for page in args.pages:
+            result = profile_page(page, Path(workdir) / "startup.db")
+            budget = BUDGETS_MS[page] * args.budget_scale
+            result["budget_ms"] = budget
+            report[page] = result
+
+            if "error" in result:
+                print(f"{page}: failed to run: {result['error']}")
+                over_budget.append(page)
+                continue
+
+            status = "ok" if result["first_render_ms"] <= budget else "OVER BUDGET"
+            print(f"{page}: first render {result['first_render_ms']} ms "
+                  f"(imports {result['import_ms']} ms, budget {budget:.0f} ms) {status}")
+            for item in result["imports"][:args.top]:
+                print(f"    {item['cumulative_ms']:>8} ms  {item['module']}")
+            if status != "ok":
+                over_budget.append(page)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Time VectorIndex.search() at chatbot-index sizes and check its recall.
+
+    python -m benchmarks.vector_search
+    python -m benchmarks.vector_search --sizes 50000 1000000 --budget-ms 20
+
+The vectors are synthetic: unit vectors scattered around topic centres, the
+way embeddings of related incidents and tickets bunch together, and each
+query is a perturbed copy of a stored vector. Every search is also run
+as a plain scan over all vectors, which gives both the brute-force time
+and the exact answer that recall@k is measured against. The script exits
+with status 1 if the median search time at any size is over --budget-ms.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.services.vector_index import VectorIndex
+from benchmarks.run_benchmarks import measure
+
+
+def topic_vectors(rng, n, dim, topics=2000, spread=0.6, chunk=100_000):
+    """n unit vectors around `topics` centres, made in chunks to bound memory."""
+    centres = rng.normal(size=(topics, dim)).astype("float32")
+    out = np.empty((n, dim), dtype="float32")
+    for start in range(0, n, chunk):
+        size = min(chunk, n - start)
+        block = centres[rng.integers(topics, size=size)]
+        block += spread * rng.normal(size=(size, dim)).astype("float32")
+        out[start:start + size] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return out
+
+
+def exact_top(vectors, query, k):
+    scores = vectors @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def run_size(n, dim, k, queries, repeat, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = topic_vectors(rng, n, dim)
+    start = time.perf_counter()
+    index = VectorIndex(dim)
+    index.add(np.arange(n), vectors)
+    build_s = time.perf_counter() - start
+
+    picks = vectors[rng.choice(n, size=queries, replace=False)]
+    picks = picks + 0.3 * rng.normal(size=picks.shape).astype("float32") / np.sqrt(dim)
+    picks /= np.linalg.norm(picks, axis=1, keepdims=True)
+
+    recall = np.mean([
+        len({i for i, _ in index.search(q, k)} & set(exact_top(vectors, q, k).tolist())) / k
+        for q in picks
+    ])
+    queue = iter(np.resize(np.arange(queries), repeat * 2))
+    return {
+        "vectors": n,
+        "dim": dim,
+        "ivf": index._centroids is not None,
+        "build_s": round(build_s, 2),
+        f"recall_at_{k}": round(float(recall), 3),
+        "search": measure(lambda: index.search(picks[next(queue)], k), repeat),
+        # A full scan is far slower at these sizes, so run it fewer times
+        "brute_force": measure(lambda: exact_top(vectors, picks[next(queue)], k), max(1, repeat // 10)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VectorIndex.search().")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--dim", type=int, default=256, help="embedding size (both embedders use 256)")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=50,
+                        help="queries scored against the exact answer for recall")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--budget-ms", type=float, default=20.0,
+                        help="slowest allowed median search time")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results, over = [], []
+    for n in args.sizes:
+        print(f"Building an index of {n:,} vectors...")
+        result = run_size(n, args.dim, args.k, args.queries, args.repeat)
+        results.append(result)
+        search, brute = result["search"], result["brute_force"]
+        print(
+            f"  search median {search['median_ms']:.2f} ms, p95 {search['p95_ms']:.2f} ms "
+            f"(brute force {brute['median_ms']:.2f} ms), "
+            f"recall@{args.k} {result[f'recall_at_{args.k}']:.3f}, built in {result['build_s']:.1f} s"
+        )
+        if search["median_ms"] > args.budget_ms:
+            over.append((n, search["median_ms"]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    for n, median in over:
+        print(f"OVER BUDGET: search at {n:,} vectors takes {median:.2f} ms (budget {args.budget_ms:g} ms)")
+    raise SystemExit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 import streamlit as st
-from openai import OpenAI
+
+from app.services.instrumentation import set_page, stage
+from app.services.embedding_service import get_embedder
+from app.services.llm_service import get_openai_client
+from app.services.retrieval_service import build_context, is_ready, start_indexer
+from app.services.session_tokens import restore_session
 
 # ---------------- Page Config ----------------
 st.set_page_config(
@@ -7,20 +12,36 @@ st.set_page_config(
     page_icon="🧠",
     layout="wide"
 )
+set_page("Chatbot")
 
 # ---------------- Auth Check ----------------
+restore_session(st.session_state, st.query_params)
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.error("Please log in first.")
     st.stop()
 
+# Number of messages shown per "load earlier" step
+HISTORY_PAGE_SIZE = 20
+
 # ---------------- Safe Defaults ----------------
 st.session_state.setdefault("username", "Unknown")
 st.session_state.setdefault("role", "user")
 st.session_state.setdefault("messages", [])
 st.session_state.setdefault("selected_domain", "Cybersecurity")
+st.session_state.setdefault("turn_count", 0)
+st.session_state.setdefault("history_window", HISTORY_PAGE_SIZE)
 
 # ---------------- OpenAI Client ----------------
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+# Created once per process and shared by every session
+client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+
+# ---------------- Record Retrieval ----------------
+# Incidents and tickets are indexed in the background (once per process) so
+# the most relevant ones can be added to each prompt
+start_indexer(get_embedder(st.secrets["OPENAI_API_KEY"]))
+
+# Records added to the prompt per question
+CONTEXT_RECORDS = 5
 
 # ---------------- System Prompts ----------------
 DOMAIN_PROMPTS = {
@@ -71,23 +92,34 @@ with left_panel:
     st.markdown("#### 📌 Active System Prompt")
     st.info(DOMAIN_PROMPTS[st.session_state.selected_domain])
 
+    if not is_ready():
+        st.caption("⏳ Indexing incidents and tickets, answers won't cite them yet.")
+
     st.markdown("---")
 
     if st.button("🗑 Reset Conversation", use_container_width=True):
         st.session_state.messages = []
+        st.session_state.turn_count = 0
+        st.session_state.history_window = HISTORY_PAGE_SIZE
         st.rerun()
 
-    st.metric(
-        "Conversation Turns",
-        len([m for m in st.session_state.messages if m["role"] != "system"])
-    )
+    # Running counter, updated whenever a message is appended
+    st.metric("Conversation Turns", st.session_state.turn_count)
 
 # ---------------- CHAT PANEL ----------------
 with chat_panel:
     st.subheader("💬 AI Workspace")
 
-    # Render chat history
-    for msg in st.session_state.messages:
+    # Render only the most recent part of the chat history
+    history = st.session_state.messages
+    hidden = max(len(history) - st.session_state.history_window, 0)
+
+    if hidden:
+        if st.button(f"⬆ Load earlier messages ({hidden} hidden)", use_container_width=True):
+            st.session_state.history_window += HISTORY_PAGE_SIZE
+            st.rerun()
+
+    for msg in history[hidden:]:
         with st.chat_message(msg["role"]):
             st.markdown(msg["content"])
 
@@ -105,14 +137,29 @@ with chat_panel:
             "role": "user",
             "content": user_input
         })
+        st.session_state.turn_count += 1
+
+        # Look up the incidents and tickets closest to the question
+        with stage("retrieval") as rec:
+            context = build_context(user_input, k=CONTEXT_RECORDS)
+            rec["rows"] = context.count("\n") + 1 if context else 0
+
+        system_prompt = DOMAIN_PROMPTS[st.session_state.selected_domain]
+        if context:
+            system_prompt += (
+                "\n\nRecords from our incident and ticket database that may be relevant "
+                "(cite them when you use them):\n" + context
+            )
+            with st.expander("📎 Records used for this answer"):
+                st.markdown(context)
 
         # Prepare full conversation with system prompt at top
         messages_payload = [
-            {"role": "system", "content": DOMAIN_PROMPTS[st.session_state.selected_domain]}
+            {"role": "system", "content": system_prompt}
         ] + st.session_state.messages
 
         # Generate AI reply
-        with st.spinner("AI is processing..."):
+        with st.spinner("AI is processing..."), stage("openai_chat"):
             response = client.chat.completions.create(
                 model=model,
                 messages=messages_payload,
@@ -129,3 +176,4 @@ with chat_panel:
             "role": "assistant",
             "content": assistant_reply
         })
+        st.session_state.turn_count += 1
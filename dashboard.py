@@ -1,15 +1,22 @@
 import streamlit as st
-import pandas as pd
 from pathlib import Path
 
+from app.data.arrow_cache import describe_table, filter_contains, numeric_columns, open_table
+from app.services.export_service import table_batches
+from app.services.instrumentation import set_page, stage
+from app.services.session_tokens import end_session, restore_session
+from app.ui.exports import export_controls
+
 # -----------------------------
 # PAGE CONFIG
 # -----------------------------
 st.set_page_config(page_title="Dashboard", layout="wide")
+set_page("Dashboard")
 
 # -----------------------------
 # ACCESS CONTROL
 # -----------------------------
+restore_session(st.session_state, st.query_params)
 if not st.session_state.get("logged_in", False):
     st.error("Access denied. Please log in first.")
     if st.button("Return to Login Page"):
@@ -25,8 +32,7 @@ st.write("Welcome to your interactive dashboard area.")
 
 st.divider()
 if st.button("Sign Out"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    end_session(st.session_state, st.query_params)
     st.info("You have been signed out.")
     st.switch_page("Home.py")
 
@@ -64,32 +70,43 @@ def display_csv(fp: Path):
     st.caption(str(fp))
     
     try:
-        df = pd.read_csv(fp)
+        # Memory-mapped Arrow copy of the CSV, shared by every session
+        with stage("open_table", bytes=fp.stat().st_size) as rec:
+            table = open_table(fp)
+            rec["rows"] = table.num_rows
     except Exception as e:
         st.error(f"Failed to read {fp.name}: {e}")
         return
 
     # Expandable search/filter
     with st.expander("🔍 Filter / Search"):
-        col_to_search = st.selectbox("Select column to search", df.columns.tolist(), key=f"search_col_{fp.name}")
+        col_to_search = st.selectbox("Select column to search", table.column_names, key=f"search_col_{fp.name}")
         search_value = st.text_input("Filter value", key=f"search_val_{fp.name}")
-        filtered_df = df[df[col_to_search].astype(str).str.contains(search_value, case=False, na=False)] if search_value else df
+        filtered = filter_contains(table, col_to_search, search_value) if search_value else table
 
     # Tabs: Table / Summary / Charts
     tab_table, tab_summary, tab_chart = st.tabs(["Table", "Summary", "Charts"])
 
     with tab_table:
-        st.dataframe(filtered_df.head(10), use_container_width=True)
-        st.caption(f"First 10 rows — {len(filtered_df)} rows × {len(filtered_df.columns)} columns.")
+        # slice() is a view into the mapped file, nothing is copied
+        st.dataframe(filtered.slice(0, 10), use_container_width=True)
+        st.caption(f"First 10 rows — {filtered.num_rows} rows × {filtered.num_columns} columns.")
+        # Exports what the filter above shows, read batch by batch from the mapped file
+        export_controls(
+            fp.name,
+            f"{fp.stem}-filtered" if search_value else fp.stem,
+            lambda: table_batches(table, col_to_search, search_value),
+            total=table.num_rows,
+        )
 
     with tab_summary:
         try:
-            st.dataframe(filtered_df.describe(include="all").transpose().fillna(""))
+            st.dataframe(describe_table(filtered), use_container_width=True)
         except Exception:
             st.info("No summary available for this CSV.")
 
     with tab_chart:
-        numeric_cols = filtered_df.select_dtypes(include="number").columns.tolist()
+        numeric_cols = numeric_columns(filtered)
         if numeric_cols:
             chart_type = st.selectbox(
                 "Chart Type",
@@ -97,15 +114,18 @@ def display_csv(fp: Path):
                 key=f"chart_type_{fp.name}"
             )
             y_col = st.selectbox("Select Y-axis", numeric_cols, key=f"chart_y_{fp.name}")
-            x_col_options = filtered_df.columns.tolist()
+            x_col_options = filtered.column_names
             x_col = st.selectbox("Select X-axis", x_col_options, key=f"chart_x_{fp.name}")
 
+            # Only the two plotted columns are converted to pandas
+            columns = list(dict.fromkeys([x_col, y_col]))
+            chart_data = filtered.select(columns).to_pandas().set_index(x_col, drop=False)[y_col]
             if chart_type == "Line Chart":
-                st.line_chart(filtered_df.set_index(x_col)[y_col])
+                st.line_chart(chart_data)
             elif chart_type == "Bar Chart":
-                st.bar_chart(filtered_df.set_index(x_col)[y_col])
+                st.bar_chart(chart_data)
             elif chart_type == "Area Chart":
-                st.area_chart(filtered_df.set_index(x_col)[y_col])
+                st.area_chart(chart_data)
         else:
             st.info("No numeric columns available for charts.")
 
@@ -1,13 +1,15 @@
 import streamlit as st
-import json
-import os
+
+from app.data.users import user_exists
+from app.services.instrumentation import set_page
+from app.services.session_tokens import end_session, restore_session, start_session
+from app.services.user_service import authenticate, create_account
 
 # ------------------------------------------------------------
 # PAGE CONFIG
 # ------------------------------------------------------------
 st.set_page_config(page_title="Login", layout="centered")
-
-USERS_FILE = "users.json"
+set_page("Home")
 
 
 # ------------------------------------------------------------
@@ -15,25 +17,10 @@ USERS_FILE = "users.json"
 # ------------------------------------------------------------
 def logout():
     """Clear session and log out the user."""
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    end_session(st.session_state, st.query_params)
     st.rerun()
 
 
-def load_users():
-    """Load users from JSON file."""
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r") as file:
-            return json.load(file)
-    return {}
-
-
-def save_users(users):
-    """Save users to JSON file."""
-    with open(USERS_FILE, "w") as file:
-        json.dump(users, file, indent=4)
-
-
 # ------------------------------------------------------------
 # SESSION INITIALIZATION
 # ------------------------------------------------------------
@@ -43,10 +30,8 @@ if "logged_in" not in st.session_state:
 if "username" not in st.session_state:
     st.session_state.username = ""
 
-# ------------------------------------------------------------
-# LOAD USERS
-# ------------------------------------------------------------
-persistent_users = load_users()
+# A token in the URL signs the user back in without a password check
+restore_session(st.session_state, st.query_params)
 
 
 # ------------------------------------------------------------
@@ -109,9 +94,9 @@ with login_tab:
     login_btn = st.button("Sign In", use_container_width=True)
 
     if login_btn:
-        if username in persistent_users and persistent_users[username] == password:
-            st.session_state.logged_in = True
-            st.session_state.username = username
+        user = authenticate(username, password)
+        if user:
+            start_session(st.session_state, st.query_params, user)
             st.success("Login successful! Redirecting...")
             st.rerun()
         else:
@@ -139,9 +124,8 @@ with register_tab:
             st.warning("Please fill in all fields.")
         elif new_pass != confirm_pass:
             st.error("Passwords do not match.")
-        elif new_user in persistent_users:
+        elif user_exists(new_user):
             st.error("Username already exists. Try another one.")
         else:
-            persistent_users[new_user] = new_pass
-            save_users(persistent_users)
+            create_account(new_user, new_pass)
             st.success("Account created! Switch to the Login tab to sign in.")
@@ -1,11 +1,12 @@
 # main.py
 
 from contextlib import closing
-from app.data.db import connect_database
+from app.data.db import DATA_DIR, connect_database
+from app.data.incidents import INCIDENT_TABLES, import_legacy_incidents
 from app.data.schema import create_all_tables
-from app.data.tickets import insert_ticket, list_tickets, ticket_exists
+from app.data.tickets import import_tickets_csv, insert_ticket, list_tickets, ticket_exists
 from app.data.users import user_exists
-from app.services.user_service import authenticate, create_account
+from app.services.user_service import authenticate, create_account, import_legacy_users
 
 def main():
     print("Initializing database...")
@@ -14,6 +15,16 @@ def main():
         # Create tables if not exist
         create_all_tables(db)
 
+        # Bring over accounts, incidents and tickets from the old file-based storage
+        print("Imported users:", import_legacy_users())
+        for table in INCIDENT_TABLES:
+            legacy_db = DATA_DIR / f"{table}.db"
+            if legacy_db.exists():
+                print(f"Imported {table}:", import_legacy_incidents(table, legacy_db))
+        tickets_csv = DATA_DIR / "it_tickets.csv"
+        if tickets_csv.exists():
+            print("Imported tickets:", import_tickets_csv(tickets_csv))
+
         # Admin user setup
         admin_username = "admin67892341239987"
         admin_password = "admin123"
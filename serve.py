@@ -0,0 +1,157 @@
+# serve.py
+#
+# Runs several Streamlit worker processes behind one local TCP reverse proxy.
+#
+#   python serve.py --workers 4 --port 8501            # round robin
+#   python serve.py --workers 4 --port 8501 --sticky   # same client -> same worker
+#   python serve.py --workers 2 --smoke                # start, check, stop
+#
+# Workers share everything that matters through DATA/: the SQLite database
+# (writes go one at a time through app.data.db.write_connection), the Arrow
+# copies of the CSVs, and the blob store. Each worker's in-memory caches
+# are keyed on file stamps or table versions, so they never serve stale data.
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from app.data.db import connect_database
+from app.data.schema import create_all_tables
+
+ROOT = Path(__file__).resolve().parent
+
+
+def start_workers(script, count, first_port):
+    """Launch `count` headless Streamlit servers on consecutive ports."""
+    workers = []
+    for i in range(count):
+        port = first_port + i
+        proc = subprocess.Popen([
+            sys.executable, "-m", "streamlit", "run", str(ROOT / script),
+            "--server.port", str(port),
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            # The proxy is the only client, so Streamlit's own checks get in the way
+            "--server.enableCORS", "false",
+            "--server.enableXsrfProtection", "false",
+        ], cwd=ROOT)
+        workers.append((port, proc))
+    return workers
+
+
+def wait_until_healthy(ports, timeout=60):
+    """Block until every worker answers its health check."""
+    deadline = time.time() + timeout
+    pending = set(ports)
+    while pending and time.time() < deadline:
+        for port in list(pending):
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        pending.discard(port)
+            except OSError:
+                pass
+        time.sleep(0.5)
+    if pending:
+        raise RuntimeError(f"Workers on ports {sorted(pending)} did not start")
+
+
+class Proxy:
+    """Forward each TCP connection to one worker.
+
+    A Streamlit session lives on one websocket, so per-connection balancing
+    already keeps a session on one worker while it is connected. With
+    sticky=True the worker is chosen from the client's address, which means
+    reconnects land on the same worker too.
+    """
+
+    def __init__(self, ports, sticky=False):
+        self.ports = ports
+        self.sticky = sticky
+        self._next = itertools.cycle(ports)
+
+    def pick(self, client_host):
+        if self.sticky:
+            digest = hashlib.sha1(client_host.encode("utf-8")).digest()
+            return self.ports[int.from_bytes(digest[:4], "big") % len(self.ports)]
+        return next(self._next)
+
+    async def handle(self, client_reader, client_writer):
+        client_host = client_writer.get_extra_info("peername")[0]
+        port = self.pick(client_host)
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            client_writer.close()
+            return
+
+        async def pipe(reader, writer):
+            try:
+                while data := await reader.read(65536):
+                    writer.write(data)
+                    await writer.drain()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                writer.close()
+
+        await asyncio.gather(pipe(client_reader, upstream_writer), pipe(upstream_reader, client_writer))
+
+
+def smoke_check(port, requests=20):
+    """Send health checks through the proxy and make sure they all succeed."""
+    for _ in range(requests):
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=5) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"Proxy returned {resp.status}")
+    print(f"Smoke check passed: {requests} requests through the proxy.")
+
+
+async def run_proxy(proxy, port, smoke):
+    server = await asyncio.start_server(proxy.handle, "127.0.0.1", port)
+    print(f"Proxy listening on http://127.0.0.1:{port} -> workers {proxy.ports}")
+    async with server:
+        if smoke:
+            await asyncio.to_thread(smoke_check, port)
+            return
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the app on several worker processes.")
+    parser.add_argument("--script", default="home.py")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8501, help="port the proxy listens on")
+    parser.add_argument("--worker-port", type=int, default=8600, help="first worker port")
+    parser.add_argument("--sticky", action="store_true", help="pin each client address to one worker")
+    parser.add_argument("--smoke", action="store_true", help="start everything, check the proxy, then stop")
+    args = parser.parse_args()
+
+    # Migrate once up front instead of letting every worker race to do it
+    conn = connect_database()
+    create_all_tables(conn)
+    conn.close()
+
+    workers = start_workers(args.script, args.workers, args.worker_port)
+    try:
+        wait_until_healthy([port for port, _ in workers])
+        proxy = Proxy([port for port, _ in workers], sticky=args.sticky)
+        asyncio.run(run_proxy(proxy, args.port, args.smoke))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for _, proc in workers:
+            proc.send_signal(signal.SIGTERM)
+        for _, proc in workers:
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Check the Arrow copies of the CSV files and the helpers that read them.
+
+    python -m unittest tests.test_arrow_cache
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+import app.data.arrow_cache as arrow_cache
+from app.data.arrow_cache import arrow_path, convert_csv, filter_contains, open_table, text_columns
+
+SAMPLE = (
+    b"day,logged_at,title,hours\n"
+    b"2024-01-02,2024-01-02 10:00:00,VPN down,1\n"
+    b"2024-02-03,2024-02-03 11:00:00,Printer jam,2\n"
+    b"2024-02-04,2024-02-04 12:00:00,,3\n"
+)
+
+
+class HelperTest(unittest.TestCase):
+    def setUp(self):
+        self.table = pa_csv.read_csv(pa.py_buffer(SAMPLE))
+
+    def test_dates_count_as_text_columns(self):
+        self.assertTrue(pa.types.is_date(self.table.schema.field("day").type))
+        self.assertEqual(text_columns(self.table), ["day", "logged_at", "title"])
+
+    def test_filter_contains_matches_like_pandas(self):
+        def titles(pattern, column="title"):
+            return filter_contains(self.table, column, pattern)["title"].to_pylist()
+
+        self.assertEqual(titles("vpn"), ["VPN down"])
+        self.assertEqual(titles("vpn|printer"), ["VPN down", "Printer jam"])
+        self.assertEqual(titles("^jam"), [])
+        # Not a valid pattern: matched literally instead of raising
+        self.assertEqual(titles("("), [])
+        self.assertEqual(titles("2024-02", column="day"), ["Printer jam", ""])
+
+
+class ConvertTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        folder = Path(self.tmp.name)
+        self.patches = [
+            mock.patch.object(arrow_cache, "ARROW_DIR", folder / ".arrow"),
+            mock.patch.dict(arrow_cache._tables, clear=True),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.csv = folder / "tickets.csv"
+        self.csv.write_bytes(SAMPLE)
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp.cleanup()
+
+    def append(self, data):
+        with open(self.csv, "ab") as f:
+            f.write(data)
+
+    def arrow_files(self):
+        return sorted(path.name for path in arrow_cache.ARROW_DIR.glob("*.arrow"))
+
+    def assertMatchesCsv(self, table):
+        self.assertTrue(table.equals(pa_csv.read_csv(str(self.csv))))
+
+    def test_appended_rows_are_parsed_on_their_own(self):
+        first = open_table(self.csv)
+        self.assertEqual(first.num_rows, 3)
+        self.append(b"2024-03-01,2024-03-01 09:00:00,Disk full,4\n")
+
+        with mock.patch.object(arrow_cache, "_full_convert", side_effect=AssertionError("full parse")):
+            table = open_table(self.csv)
+        manifest = convert_csv(self.csv)
+        self.assertEqual(len(manifest["segments"]), 2)
+        self.assertEqual(manifest["rows"], 4)
+        self.assertEqual(self.arrow_files(), sorted(manifest["segments"]))
+        self.assertMatchesCsv(table)
+        # Unchanged since: the cached table comes back as is
+        self.assertIs(open_table(self.csv), table)
+
+    def assertFullConvert(self, table):
+        manifest = convert_csv(self.csv)
+        self.assertEqual(len(manifest["segments"]), 1)
+        self.assertEqual(self.arrow_files(), manifest["segments"])
+        self.assertMatchesCsv(table)
+
+    def test_value_of_another_type_converts_again(self):
+        open_table(self.csv)
+        self.append(b"2024-03-01,2024-03-01 09:00:00,Disk full,lots\n")
+        table = open_table(self.csv)
+        self.assertEqual(table.schema.field("hours").type, pa.string())
+        self.assertFullConvert(table)
+
+    def test_changed_header_converts_again(self):
+        open_table(self.csv)
+        self.csv.write_bytes(SAMPLE.replace(b"title", b"summary") + b"2024-03-01,2024-03-01 09:00:00,Disk,4\n")
+        table = open_table(self.csv)
+        self.assertIn("summary", table.column_names)
+        self.assertFullConvert(table)
+
+    def test_row_without_line_break_converts_again(self):
+        open_table(self.csv)
+        # Possibly a row still being written, so it is not parsed on its own
+        self.append(b"2024-03-01,2024-03-01 09:00:00,Disk full,4")
+        with mock.patch.object(arrow_cache, "_append", side_effect=AssertionError("append")):
+            table = open_table(self.csv)
+        self.assertEqual(table.num_rows, 4)
+        self.assertFullConvert(table)
+
+    def test_copy_from_before_segments_is_removed(self):
+        base = arrow_path(self.csv)
+        base.parent.mkdir(parents=True)
+        legacy = base.with_name(f"{base.name}.arrow")
+        legacy.write_bytes(b"old copy")
+        open_table(self.csv)
+        self.assertFalse(legacy.exists())
+        self.assertEqual(len(self.arrow_files()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+"""Check the vector index, the local embedder and the background refresh.
+
+    python -m unittest tests.test_retrieval
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import app.data.db as db
+import app.services.retrieval_service as retrieval
+import app.services.vector_index as vector_index
+from app.data.incidents import delete_incident, insert_incident
+from app.services.embedding_service import HashingEmbedder
+from app.services.vector_index import VectorIndex
+
+
+def clustered_vectors(n, dim=32, clusters=50, seed=0):
+    """Unit vectors spread around a few centres, like embeddings of related texts."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    vectors = centres[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype("float32")
+
+
+class VectorIndexTest(unittest.TestCase):
+    def test_ivf_agrees_with_brute_force(self):
+        vectors = clustered_vectors(20_000)
+        ids = np.arange(1, len(vectors) + 1)
+        exact = VectorIndex(32)
+        exact.add(ids, vectors)
+        # Train the clusters at this size instead of at 50,000 vectors
+        with mock.patch.object(vector_index, "BRUTE_FORCE_LIMIT", 5_000):
+            ivf = VectorIndex(32)
+            ivf.add(ids, vectors)
+        self.assertIsNone(exact._centroids)
+        self.assertIsNotNone(ivf._centroids)
+
+        # Queries near the data, as a question is near the records it asks about
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.choice(len(vectors), 50)] + 0.2 * rng.normal(size=(50, 32)).astype("float32")
+        recall = []
+        for query in queries:
+            want = [i for i, _ in exact.search(query, 10)]
+            got = [i for i, _ in ivf.search(query, 10)]
+            self.assertEqual(got[0], want[0])
+            recall.append(len(set(got) & set(want)) / 10)
+        self.assertGreaterEqual(np.mean(recall), 0.95)
+
+        # A stored vector always finds itself first
+        self.assertEqual(ivf.search(vectors[123], 1)[0][0], 124)
+
+    def test_removed_vectors_are_not_found(self):
+        vectors = clustered_vectors(100)
+        index = VectorIndex(32)
+        index.add(range(1, 101), vectors, tags=range(101, 201))
+        index.remove([5])
+        self.assertEqual(len(index), 99)
+        self.assertNotIn(5, [i for i, _ in index.search(vectors[4], 10)])
+        self.assertEqual(index.tags([4, 5, 6]), {4: 104, 6: 106})
+
+        # Removing past COMPACT_RATIO rewrites the arrays; ids and tags stay paired
+        index.remove(range(1, 40))
+        self.assertEqual(index._dead, 0)
+        self.assertEqual(len(index), 61)
+        self.assertEqual(index.search(vectors[49], 1)[0][0], 50)
+        ids, tags = index.entries()
+        self.assertEqual(ids.tolist(), list(range(40, 101)))
+        self.assertEqual(tags.tolist(), list(range(140, 201)))
+
+        # Replacing a vector is remove() then add()
+        index.remove([50])
+        index.add([50], vectors[:1])
+        self.assertEqual(index.search(vectors[0], 1)[0][0], 50)
+
+
+class HashingEmbedderTest(unittest.TestCase):
+    def test_vectors_are_deterministic_and_normalised(self):
+        texts = ["VPN down again", "vpn DOWN again", "Printer jam", ""]
+        vectors = HashingEmbedder().embed(texts)
+        self.assertEqual(vectors.shape, (4, 256))
+        self.assertEqual(vectors.dtype, np.float32)
+        # Same words in any case give the same vector, in every instance
+        np.testing.assert_array_equal(vectors[0], vectors[1])
+        np.testing.assert_array_equal(vectors, HashingEmbedder().embed(texts))
+        np.testing.assert_allclose(np.linalg.norm(vectors[:3], axis=1), 1, rtol=1e-6)
+        self.assertFalse(vectors[3].any())
+        self.assertGreater(vectors[0] @ HashingEmbedder().embed(["vpn"])[0], vectors[2] @ vectors[0])
+
+
+class RefreshTest(unittest.TestCase):
+    TABLE = "incidents"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.old_path = db.DB_PATH
+        db.DB_PATH = Path(self.tmp.name) / "app.db"
+        # Drive _refresh() directly rather than through the indexer thread
+        self.state = mock.patch.multiple(
+            retrieval, _indexes={self.TABLE: VectorIndex(256)}, _progress={}, _embedder=HashingEmbedder()
+        )
+        self.state.start()
+        self.index = retrieval._indexes[self.TABLE]
+
+    def tearDown(self):
+        self.state.stop()
+        db.DB_PATH = self.old_path
+        self.tmp.cleanup()
+
+    def indexed(self):
+        ids, tags = self.index.entries()
+        return dict(zip(ids.tolist(), tags.tolist()))
+
+    def best(self, text):
+        return self.index.search(HashingEmbedder().embed([text])[0], 1)[0][0]
+
+    def test_refresh_follows_inserts_updates_and_deletes(self):
+        vpn = insert_incident(self.TABLE, "VPN gateway down", "High", "Open")
+        printer = insert_incident(self.TABLE, "Printer jam", "Low", "Open")
+        retrieval._refresh(self.TABLE)
+        self.assertEqual(set(self.indexed()), {vpn, printer})
+        self.assertEqual(self.best("vpn gateway"), vpn)
+
+        # Incremental pass: a new row, a new title and a status change
+        disk = insert_incident(self.TABLE, "Disk full on mail server", "High", "Open")
+        with db.write_connection() as conn:
+            conn.execute("UPDATE incidents SET title = 'Phishing email' WHERE id = ?", (printer,))
+            conn.execute("UPDATE incidents SET status = 'Closed' WHERE id = ?", (vpn,))
+        with mock.patch.object(self.index, "remove", wraps=self.index.remove) as remove:
+            retrieval._refresh(self.TABLE)
+        self.assertIsNotNone(retrieval._progress[self.TABLE][1])
+        # Only the retitled row was embedded again
+        self.assertEqual(sorted(remove.call_args.args[0]), [printer])
+        self.assertEqual(set(self.indexed()), {vpn, printer, disk})
+        self.assertEqual(self.best("phishing"), printer)
+        self.assertEqual(self.best("mail server"), disk)
+
+        delete_incident(self.TABLE, vpn)
+        retrieval._refresh(self.TABLE)
+        self.assertEqual(set(self.indexed()), {printer, disk})
+
+    def test_pruned_log_falls_back_to_full_pass(self):
+        keep = insert_incident(self.TABLE, "VPN gateway down", "High", "Open")
+        drop = insert_incident(self.TABLE, "Printer jam", "Low", "Open")
+        retrieval._refresh(self.TABLE)
+
+        delete_incident(self.TABLE, drop)
+        with db.write_connection() as conn:
+            conn.execute("UPDATE incidents SET title = 'Phishing email' WHERE id = ?", (keep,))
+            conn.execute("DELETE FROM row_changes")
+        retrieval._refresh(self.TABLE)
+        self.assertEqual(list(self.indexed()), [keep])
+        self.assertEqual(self.indexed()[keep], retrieval._tag(self.TABLE, {"title": "Phishing email"}))
+
+
+class RetryTest(unittest.TestCase):
+    def test_failing_table_backs_off_and_recovers(self):
+        clock = [1000.0]
+        calls = []
+
+        def refresh(table):
+            calls.append(table)
+            if table == "tickets" and clock[0] < 1100:
+                raise OSError("disk I/O error")
+
+        with mock.patch.multiple(retrieval, _refresh=refresh, _failures={}), \
+                mock.patch.object(retrieval.time, "monotonic", lambda: clock[0]), \
+                self.assertLogs(retrieval.logger) as logs:
+            def tick(seconds):
+                calls.clear()
+                clock[0] += seconds
+                retrieval._refresh_due(2.0)
+                return calls.count("tickets")
+
+            self.assertEqual(tick(0), 1)
+            self.assertEqual(calls.count("incidents"), 1)
+            # Retried after 2 s, then 4, 8, ... while the other tables carry on
+            self.assertEqual(tick(1), 0)
+            self.assertEqual(calls.count("incidents"), 1)
+            self.assertEqual(tick(1), 1)
+            self.assertEqual(tick(3), 0)
+            self.assertEqual(tick(1), 1)
+            self.assertEqual(retrieval._failures["tickets"][0], 3)
+            # The delay is capped
+            retrieval._failures["tickets"] = (20, 0.0)
+            self.assertEqual(tick(0), 1)
+            self.assertEqual(retrieval._failures["tickets"], (21, clock[0] + retrieval.MAX_RETRY_DELAY))
+
+            self.assertEqual(tick(retrieval.MAX_RETRY_DELAY), 1)
+            self.assertNotIn("tickets", retrieval._failures)
+        self.assertIn("retrying in 2 s", logs.output[0])
+        self.assertIn("disk I/O error", logs.output[0])
+        self.assertIn("recovered after 21 failures", logs.output[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
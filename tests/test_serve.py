@@ -0,0 +1,88 @@
+"""Check the multi-worker launcher and its reverse proxy.
+
+    python -m unittest tests.test_serve
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from serve import ROOT, Proxy
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ProxyTest(unittest.IsolatedAsyncioTestCase):
+    """Fake workers that answer with their own port, behind a real Proxy."""
+
+    async def asyncSetUp(self):
+        self.servers = []
+        ports = []
+        for _ in range(3):
+            server = await asyncio.start_server(self.answer, "127.0.0.1", 0)
+            self.servers.append(server)
+            ports.append(server.sockets[0].getsockname()[1])
+        self.ports = ports
+
+    async def asyncTearDown(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+
+    async def answer(self, reader, writer):
+        writer.write(str(writer.get_extra_info("sockname")[1]).encode("ascii"))
+        await writer.drain()
+        writer.close()
+
+    async def request(self, proxy_port, client_host="127.0.0.1"):
+        """Connect through the proxy from client_host and return the worker port that answered."""
+        reader, writer = await asyncio.open_connection("127.0.0.1", proxy_port, local_addr=(client_host, 0))
+        data = await reader.read()
+        writer.close()
+        return int(data)
+
+    async def serve(self, proxy):
+        server = await asyncio.start_server(proxy.handle, "127.0.0.1", 0)
+        self.servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    async def test_round_robin_uses_every_worker(self):
+        port = await self.serve(Proxy(self.ports))
+        hits = Counter([await self.request(port) for _ in range(9)])
+        self.assertEqual(hits, Counter({p: 3 for p in self.ports}))
+
+    async def test_sticky_pins_each_client_and_spreads_clients(self):
+        port = await self.serve(Proxy(self.ports, sticky=True))
+        # Every 127.x.y.z address is loopback on Linux, so each is a separate client
+        clients = [f"127.0.0.{i}" for i in range(1, 21)]
+        first = {host: await self.request(port, host) for host in clients}
+        again = {host: await self.request(port, host) for host in clients}
+        self.assertEqual(first, again)
+        self.assertGreater(len(set(first.values())), 1)
+
+
+@unittest.skipIf(sys.platform == "win32", "serve.py relies on POSIX signals")
+class ServeSmokeTest(unittest.TestCase):
+    def test_two_workers_behind_the_proxy(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = {**os.environ, "APP_DB_PATH": str(Path(workdir) / "serve.db")}
+            proc = subprocess.run(
+                [sys.executable, "serve.py", "--workers", "2", "--smoke",
+                 "--port", str(free_port()), "--worker-port", str(free_port())],
+                cwd=ROOT, env=env, capture_output=True, text=True, timeout=180,
+            )
+        self.assertEqual(proc.returncode, 0, proc.stderr[-2000:])
+        self.assertIn("Smoke check passed", proc.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
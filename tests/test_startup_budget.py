@@ -0,0 +1,30 @@
+"""Check each page's time-to-first-render against its budget.
+
+    python -m unittest tests.test_startup_budget
+
+Budgets are in benchmarks/startup_profile.py. On slow machines set
+APP_STARTUP_BUDGET_SCALE (e.g. 2) to multiply every budget.
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks.startup_profile import BUDGETS_MS, profile_page
+
+BUDGET_SCALE = float(os.environ.get("APP_STARTUP_BUDGET_SCALE", "1"))
+
+
+class StartupBudgetTest(unittest.TestCase):
+    def test_pages_render_within_budget(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            for page, budget in BUDGETS_MS.items():
+                with self.subTest(page=page):
+                    result = profile_page(page, Path(workdir) / "startup.db")
+                    self.assertNotIn("error", result)
+                    self.assertEqual(result["errors"], [])
+                    self.assertLessEqual(result["first_render_ms"], budget * BUDGET_SCALE)
+
+
+if __name__ == "__main__":
+    unittest.main()
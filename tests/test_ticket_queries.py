@@ -0,0 +1,94 @@
+"""Check that the ticket queries use their indexes and summary tables.
+
+    python -m unittest tests.test_ticket_queries
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+import app.data.db as db
+from app.data.tickets import (
+    count_tickets, count_tickets_by, count_tickets_by_month, delete_ticket, insert_tickets,
+    list_tickets, ticket_exists, update_ticket_status,
+)
+
+COLUMNS = ("ticket_id", "priority", "status", "category", "subject", "description",
+           "created_date", "resolved_date", "assigned_to")
+TICKETS = [dict(zip(COLUMNS, row)) for row in (
+    ("T-1", "High", "Open", "Network", "VPN down", "", "2024-01-05 09:00:00", None, "alice"),
+    ("T-2", "Low", "Resolved", "Email", "Spam", "", "2024-01-20 10:00:00", "2024-01-21 10:00:00", "bob"),
+    ("T-3", "High", "Open", "Network", "Wi-Fi", "", "2024-02-02 08:00:00", None, "alice"),
+    ("T-4", None, "Open", "Hardware", "Laptop", "", None, None, None),
+)]
+
+
+class TicketQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.old_path = db.DB_PATH
+        db.DB_PATH = Path(self.tmp.name) / "app.db"
+        insert_tickets(TICKETS)
+
+    def tearDown(self):
+        db.DB_PATH = self.old_path
+        self.tmp.cleanup()
+
+    def plans(self, call):
+        """Run call() and return the query plan of each SELECT it issued."""
+        statements = []
+        # The pool hands the most recently returned connection out first,
+        # so call() runs on the connection being traced
+        with db.pooled_connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+        return [
+            " | ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            for sql in statements
+            if sql.lstrip().upper().startswith("SELECT")
+        ]
+
+    def assertUses(self, call, name):
+        plans = self.plans(call)
+        self.assertTrue(plans, "no query was run")
+        for plan in plans:
+            self.assertIn(name, plan)
+            self.assertNotRegex(plan, r"SCAN tickets(?! USING)")
+
+    def test_filtered_lists_use_indexes(self):
+        self.assertUses(lambda: list_tickets(status="Open", priority="High"), "idx_tickets_status_priority")
+        self.assertUses(lambda: list_tickets(assigned_to="alice", status="Open"), "idx_tickets_assigned_status")
+        self.assertUses(lambda: list_tickets(created_from="2024-01-01", created_to="2024-02-01"), "idx_tickets_created")
+        self.assertUses(lambda: count_tickets(status="Open"), "idx_tickets_status_priority")
+
+    def test_ticket_exists_uses_unique_index(self):
+        self.assertUses(lambda: ticket_exists("T-1"), "sqlite_autoindex_tickets")
+
+    def test_chart_counts_use_summary_table(self):
+        self.assertUses(lambda: count_tickets_by("priority"), "ticket_month_counts")
+        self.assertUses(count_tickets_by_month, "ticket_month_counts")
+        self.assertUses(lambda: count_tickets_by_month(priority="High"), "ticket_month_counts")
+
+    def test_summary_counts_follow_changes(self):
+        self.assertEqual(count_tickets_by("priority"), {"High": 2, "Low": 1, None: 1})
+        self.assertEqual(count_tickets_by_month(), {"2024-01": 2, "2024-02": 1})
+
+        with db.write_connection() as conn:
+            conn.execute("UPDATE tickets SET priority = 'Low', created_date = '2024-03-01' WHERE ticket_id = 'T-3'")
+        update_ticket_status("T-1", "Resolved", "2024-01-06 09:00:00")
+        # The deleted row comes back for the audit log
+        self.assertEqual(delete_ticket("T-2")["subject"], "Spam")
+        self.assertIsNone(delete_ticket("T-2"))
+
+        self.assertEqual(count_tickets_by("priority"), {"High": 1, "Low": 1, None: 1})
+        self.assertEqual(count_tickets_by_month(), {"2024-01": 1, "2024-03": 1})
+        self.assertEqual(count_tickets_by_month(priority="Low"), {"2024-03": 1})
+        # The summary agrees with counting the table itself
+        direct = db.fetch_all("SELECT priority, COUNT(*) AS n FROM tickets GROUP BY priority")
+        self.assertEqual(count_tickets_by("priority"), {row["priority"]: row["n"] for row in direct})
+
+
+if __name__ == "__main__":
+    unittest.main()
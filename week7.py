@@ -1,83 +1,9 @@
+from app.data.users import get_user, user_exists
+from app.services.user_service import create_account, verify_password
 
-import bcrypt
-import os
+# Users are stored in the shared database (app/data) instead of users.txt.
+# hash_password / verify_password now live in app/services/user_service.py.
 
-# The file which we will store user data 
-
-USER_DATA_FILE = "users.txt"
-
-
-
-#HASHING FUNCTION.
-
-
-
-def hash_password(plain_text_password):
-    # Encode the password into bytes
-    password_bytes = plain_text_password.encode('utf-8')
-
-    # Generate a unique salt
-    salt = bcrypt.gensalt()
-
-    # Hash the password using the salt
-    hashed = bcrypt.hashpw(password_bytes, salt)
-
-    # Convert hashed bytes to a string for storage
-    return hashed.decode('utf-8')
-
-
-
-#PASSWORD AUTHENTICATION FUNCTION
-
-
-def verify_password(plain_text_password, hashed_password):
-    # Convert both the plain password and the stored hash into bytes
-    password_bytes = plain_text_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-
-    # Compare the entered password with the stored hashed password
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
-
-
-
-# Creating a file
-
-USER_DATA_FILE = "users.txt"
-
-# Check for the username that it aalready exists or not
-
-def user_exists(username):
-    # Check if the user data file exists
-    if not os.path.exists(USER_DATA_FILE):
-        return False  
-    
-    # Open the file and look through each line
-    with open(USER_DATA_FILE, "r") as file:
-        for line in file:
-            stored_username = line.split(",")[0]  # Get the username part
-            if stored_username == username:
-                # Found a match, user exists
-                return True  # Found a match, user exists
-
-   
-    return False
-
-#Check if username already exists or not
-
-def user_exists(username):
-    # Check if the user data file exists
-    if not os.path.exists(USER_DATA_FILE):
-        return False  
-    # Open the file and look through each line
-    with open(USER_DATA_FILE, "r") as file:
-        for line in file:
-            stored_username = line.split(",")[0]  
-            if stored_username == username:
-                #if user exists it returns true
-                return True  
-
-    # If found nothing in whole file
-    return False
 
 # register a user
 
@@ -87,12 +13,8 @@ def register_user(username, password):
         print("Error: This username is already taken.")
         return False
 
-    # Hash the password before storing it
-    hashed_password = hash_password(password)
-
-    # Append the username and hashed password to the data file
-    with open(USER_DATA_FILE, "a") as file:
-        file.write(f"{username},{hashed_password}\n")
+    # Hash the password and store the new account
+    create_account(username, password)
 
     print(f"User '{username}' has been registered successfully!")
     return True
@@ -101,27 +23,19 @@ def register_user(username, password):
 
 
 def login_user(username, password):
-    # Check if any users are registered
-    if not os.path.exists(USER_DATA_FILE):
-        print("Error: No users registered yet.")
+    # Look the user up by username (indexed, no file scan)
+    user = get_user(username)
+
+    if user is None:
+        print("Error: Username not found.")
         return False
 
-    # Open the file and check each stored user
-    with open(USER_DATA_FILE, "r") as file:
-        for line in file:
-            stored_username, stored_hash = line.strip().split(",")
-
-            # If username matches, verify the password
-            if stored_username == username:
-                if verify_password(password, stored_hash):
-                    print(f"Success: Welcome, {username}!")
-                    return True
-                else:
-                    print("Error: Invalid password.")
-                    return False
-
-    # Username not found in file
-    print("Error: Username not found.")
+    # If username matches, verify the password
+    if verify_password(password, user["password_hash"]):
+        print(f"Success: Welcome, {username}!")
+        return True
+
+    print("Error: Invalid password.")
     return False
 
 #User Menu